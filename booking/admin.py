@@ -3,7 +3,11 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
-from .models import Booking, IPTracker, SpamLog, StudioSchedule, TimeSlot, SiteSEOSettings, PageSEO
+from .antispam import invalidate_blocklist
+from .availability import invalidate_availability
+from .models import Booking, EmailOutbox, IPTracker, SpamLog, StudioSchedule, TimeSlot, SiteSEOSettings, PageSEO
+from .services import STATUS_EMAILS, delete_bookings, transition_bookings
+from .utils import queue_booking_emails
 
 
 @admin.register(Booking)
@@ -131,51 +135,26 @@ class BookingAdmin(admin.ModelAdmin):
     block_time_slot.short_description = "Block time slots of selected bookings"
 
     def mark_as_confirmed(self, request, queryset):
-        from .utils import send_booking_confirmation_email
-        
-        confirmed_count = 0
-        for booking in queryset:
-            if booking.status != 'confirmed':
-                booking.status = 'confirmed'
-                booking.save()
-                try:
-                    send_booking_confirmation_email(booking, request)
-                    confirmed_count += 1
-                except Exception as e:
-                    print(f"Failed to send confirmation email to {booking.email}: {e}")
-        
-        self.message_user(request, f"{confirmed_count} bookings confirmed and confirmation emails sent")
+        # One UPDATE for the selection, emails go through the outbox worker
+        confirmed = transition_bookings(queryset, 'confirmed', request)
+        self.message_user(request, f"{len(confirmed)} bookings confirmed and {len(confirmed)} confirmation emails queued")
     mark_as_confirmed.short_description = "Mark selected bookings as confirmed"
     
     def mark_as_cancelled(self, request, queryset):
-        from .utils import send_booking_rejection_email
-        
-        cancelled_count = 0
-        for booking in queryset:
-            if booking.status != 'cancelled':
-                booking.status = 'cancelled'
-                booking.save()
-                try:
-                    send_booking_rejection_email(booking, request)
-                    cancelled_count += 1
-                except Exception as e:
-                    print(f"Failed to send rejection email to {booking.email}: {e}")
-        
-        self.message_user(request, f"{cancelled_count} bookings cancelled and rejection emails sent")
+        # One UPDATE for the selection, emails go through the outbox worker
+        cancelled = transition_bookings(queryset, 'cancelled', request)
+        self.message_user(request, f"{len(cancelled)} bookings cancelled and {len(cancelled)} rejection emails queued")
     mark_as_cancelled.short_description = "Mark selected bookings as cancelled"
     
     def delete_selected_bookings(self, request, queryset):
         """Delete selected bookings and free up time slots"""
         if request.POST.get('post') == 'yes':
             # User confirmed deletion
-            deleted_count = 0
-            for booking in queryset:
-                try:
-                    # This will trigger the delete method in the model which frees up time slots
-                    booking.delete()
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"Failed to delete booking {booking.id}: {e}")
+            try:
+                deleted_count = delete_bookings(queryset)
+            except Exception as e:
+                print(f"Failed to delete bookings: {e}")
+                deleted_count = 0
             
             self.message_user(request, f"{deleted_count} bookings deleted successfully")
             return None
@@ -190,58 +169,27 @@ class BookingAdmin(admin.ModelAdmin):
         return delete_selected_action(self, request, queryset)
     
     def save_model(self, request, obj, form, change):
-        """Override save_model to send email notifications when status changes"""
-        if change:  # This is an update, not a new booking
-            try:
-                # Get the original object from database
-                original_obj = Booking.objects.get(pk=obj.pk)
-                original_status = original_obj.status
-                
-                # Save the object first
-                super().save_model(request, obj, form, change)
-                
-                # Check if status changed and send email
-                if obj.status != original_status:
-                    print(f"Status changed from {original_status} to {obj.status} for booking {obj.id}")
-                    from .utils import send_booking_confirmation_email, send_booking_rejection_email
-                    
-                    if obj.status == 'confirmed':
-                        print(f"Admin: Sending confirmation email for booking {obj.id} to {obj.email}")
-                        try:
-                            result = send_booking_confirmation_email(obj, request)
-                            if result:
-                                self.message_user(request, f"Booking confirmed and confirmation email sent to {obj.email}")
-                            else:
-                                self.message_user(request, f"Booking confirmed but failed to send email to {obj.email}")
-                        except Exception as e:
-                            print(f"Error sending confirmation email: {e}")
-                            self.message_user(request, f"Booking confirmed but email error: {e}")
-                    elif obj.status == 'cancelled':
-                        print(f"Admin: Sending rejection email for booking {obj.id} to {obj.email}")
-                        try:
-                            result = send_booking_rejection_email(obj, request)
-                            if result:
-                                self.message_user(request, f"Booking cancelled and rejection email sent to {obj.email}")
-                            else:
-                                self.message_user(request, f"Booking cancelled but failed to send email to {obj.email}")
-                        except Exception as e:
-                            print(f"Error sending rejection email: {e}")
-                            self.message_user(request, f"Booking cancelled but email error: {e}")
-                else:
-                    print(f"Status didn't change for booking {obj.id}")
-                    # Status didn't change, just save normally
-                    super().save_model(request, obj, form, change)
-                    
-            except Booking.DoesNotExist:
-                # New booking, save normally
-                super().save_model(request, obj, form, change)
-            except Exception as e:
-                print(f"Error in save_model: {e}")
-                # Save anyway, but don't send email
-                super().save_model(request, obj, form, change)
-        else:
-            # New booking, save normally
-            super().save_model(request, obj, form, change)
+        """Override save_model to queue the client email when the status changes"""
+        # The booking remembers its loaded status, no need to fetch the original row
+        original_status = obj.get_dirty_fields().get('status')
+        status_changed = change and 'status' in obj.get_dirty_fields()
+        
+        super().save_model(request, obj, form, change)
+        
+        if not status_changed:
+            return
+        
+        print(f"Status changed from {original_status} to {obj.status} for booking {obj.id}")
+        kind = STATUS_EMAILS.get(obj.status)
+        if kind is None:
+            return
+        # Queued like the bulk actions: the outbox worker sends it and retries failures
+        try:
+            queue_booking_emails(kind, [obj], request)
+            self.message_user(request, f"Booking {obj.status} and {kind} email queued for {obj.email}")
+        except Exception as e:
+            print(f"Error queueing {kind} email: {e}")
+            self.message_user(request, f"Booking {obj.status} but email error: {e}")
 
 
 @admin.register(IPTracker)
@@ -265,21 +213,23 @@ class IPTrackerAdmin(admin.ModelAdmin):
     
     def block_selected_ips(self, request, queryset):
         count = queryset.update(is_blocked=True, block_reason="Manually blocked")
+        invalidate_blocklist()
         self.message_user(request, f"{count} IP addresses blocked")
     block_selected_ips.short_description = "Block selected IP addresses"
     
     def unblock_selected_ips(self, request, queryset):
         count = queryset.update(is_blocked=False, block_reason="")
+        invalidate_blocklist()
         self.message_user(request, f"{count} IP addresses unblocked")
     unblock_selected_ips.short_description = "Unblock selected IP addresses"
 
 
 @admin.register(SpamLog)
 class SpamLogAdmin(admin.ModelAdmin):
-    list_display = ['ip_address', 'attempt_type', 'timestamp', 'details_short']
+    list_display = ['ip_address', 'attempt_type', 'count', 'timestamp', 'details_short']
     list_filter = ['attempt_type', 'timestamp']
     search_fields = ['ip_address', 'details']
-    readonly_fields = ['ip_address', 'user_agent', 'attempt_type', 'details', 'timestamp']
+    readonly_fields = ['ip_address', 'user_agent', 'attempt_type', 'details', 'count', 'timestamp']
     
     def details_short(self, obj):
         """Show shortened details"""
@@ -336,22 +286,34 @@ class StudioScheduleAdmin(admin.ModelAdmin):
     reason_short.short_description = "Reason"
     
     def block_selected_dates(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=True)
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} dates blocked")
     block_selected_dates.short_description = "Block selected dates"
     
     def unblock_selected_dates(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=False, is_holiday=False, is_maintenance=False, reason="")
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} dates unblocked")
     unblock_selected_dates.short_description = "Unblock selected dates"
     
     def mark_as_holiday(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=True, is_holiday=True, is_maintenance=False)
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} dates marked as holidays")
     mark_as_holiday.short_description = "Mark selected dates as holidays"
     
     def mark_as_maintenance(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=True, is_holiday=False, is_maintenance=True)
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} dates marked as maintenance")
     mark_as_maintenance.short_description = "Mark selected dates as maintenance"
 
@@ -404,16 +366,45 @@ class TimeSlotAdmin(admin.ModelAdmin):
     reason_short.short_description = "Reason"
     
     def block_selected_slots(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=True)
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} time slots blocked")
     block_selected_slots.short_description = "Block selected time slots"
     
     def unblock_selected_slots(self, request, queryset):
+        # Dates are read first: the changelist filter may no longer match after the update
+        dates = list(queryset.values_list('date', flat=True))
         count = queryset.update(is_blocked=False, reason="")
+        invalidate_availability(*dates)
         self.message_user(request, f"{count} time slots unblocked")
     unblock_selected_slots.short_description = "Unblock selected time slots"
 
 
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'recipients', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['subject', 'to', 'last_error']
+    readonly_fields = ['kind', 'booking', 'subject', 'body', 'html_body', 'from_email', 'to', 'attempts', 'last_error', 'created_at', 'sent_at']
+    
+    actions = ['retry_selected']
+    
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+    recipients.short_description = "To"
+    
+    def retry_selected(self, request, queryset):
+        count = queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"{count} emails queued for retry")
+    retry_selected.short_description = "Retry selected emails"
+    
+    def has_add_permission(self, request):
+        """Emails are queued by the site, not created by hand"""
+        return False
+
+
 @admin.register(SiteSEOSettings)
 class SiteSEOSettingsAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'gtag_enabled', 'ga4_measurement_id')
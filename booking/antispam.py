@@ -0,0 +1,179 @@
+"""
+Cache-backed state for the anti-spam middleware.
+
+The blocklist of IPTracker rows is kept in the cache and reloaded after an
+IPTracker change invalidates it (or within a minute on a process-local
+cache, see booking.caching). Visits are recorded in a process-local buffer
+and written behind to IPTracker by a background flusher, so regular page
+views do not touch the database. Whatever is still buffered when a worker
+ends is written by flush_at_exit().
+
+SpamLog events go through the same flusher (and the same exit flush):
+identical (ip, attempt_type) events within one flush window are merged into
+a single row with a count, so a bot hammering the site costs one bulk insert
+per window instead of one INSERT per request.
+"""
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from .caching import invalidated_timeout
+from .models import IPTracker, SpamLog
+
+logger = logging.getLogger(__name__)
+
+BLOCKLIST_CACHE_KEY = 'antispam:blocklist'
+BLOCKLIST_CACHE_TIMEOUT = 24 * 60 * 60  # invalidated on change; capped on process-local caches
+SEEN_CACHE_PREFIX = 'antispam:seen'
+
+# Seconds between write-behind flushes of recorded visits (0 disables the flusher thread)
+FLUSH_INTERVAL = getattr(settings, 'ANTISPAM_FLUSH_INTERVAL', 60)
+# Flush early when this many IPs are waiting
+FLUSH_MAX_PENDING = 500
+# Flush SpamLog early when this many (ip, attempt_type) rows are waiting
+SPAM_LOG_FLUSH_SIZE = 200
+# Hard cap on buffered SpamLog rows; new keys beyond it are dropped (and counted)
+SPAM_LOG_MAX_PENDING = 2000
+
+_lock = threading.Lock()
+_pending = {}  # ip -> last seen
+_flusher = None
+_spam_lock = threading.Lock()  # held while a SpamLog flush is writing
+_spam_events = {}  # (ip, attempt_type) -> unsaved SpamLog
+_spam_dropped = 0
+
+
+def get_blocklist():
+    """{ip: block_reason} of every blocked IP, served from the cache"""
+    blocklist = cache.get(BLOCKLIST_CACHE_KEY)
+    if blocklist is None:
+        blocklist = dict(
+            IPTracker.objects.filter(is_blocked=True).values_list('ip_address', 'block_reason')
+        )
+        cache.set(BLOCKLIST_CACHE_KEY, blocklist, invalidated_timeout(BLOCKLIST_CACHE_TIMEOUT))
+    return blocklist
+
+
+def get_block_reason(ip_address):
+    """Block reason for a blocked IP, None if the IP is not blocked"""
+    return get_blocklist().get(ip_address)
+
+
+def invalidate_blocklist():
+    cache.delete(BLOCKLIST_CACHE_KEY)
+
+
+def record_ip_activity(ip_address):
+    """Remember a visit; it is written to IPTracker by the next flush"""
+    if not ip_address:
+        return
+    # Across workers, only the first visit per flush interval is buffered
+    if not cache.add(f"{SEEN_CACHE_PREFIX}:{ip_address}", 1, max(FLUSH_INTERVAL, 1)):
+        return
+    with _lock:
+        _pending[ip_address] = timezone.now()
+        pending_count = len(_pending)
+    if pending_count >= FLUSH_MAX_PENDING:
+        flush_ip_activity()
+    else:
+        _start_flusher()
+
+
+def flush_ip_activity():
+    """Write buffered visits to IPTracker: one bulk insert for new IPs, one update per known IP"""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return 0
+
+    known = set(
+        IPTracker.objects.filter(ip_address__in=pending.keys()).values_list('ip_address', flat=True)
+    )
+    IPTracker.objects.bulk_create(
+        [IPTracker(ip_address=ip, booking_count=0, is_blocked=False) for ip in pending if ip not in known],
+        ignore_conflicts=True,
+    )
+    for ip in known:
+        IPTracker.objects.filter(ip_address=ip).update(last_seen=pending[ip])
+    return len(pending)
+
+
+def log_spam_attempt(ip_address, attempt_type, user_agent='', details=''):
+    """Buffer a SpamLog event; it is written (merged with identical events) by the next flush"""
+    global _spam_dropped
+    key = (ip_address, attempt_type)
+    with _lock:
+        entry = _spam_events.get(key)
+        if entry is not None:
+            entry.count += 1
+        elif len(_spam_events) < SPAM_LOG_MAX_PENDING:
+            _spam_events[key] = SpamLog(
+                ip_address=ip_address,
+                user_agent=user_agent,
+                attempt_type=attempt_type,
+                details=details,
+                count=1,
+            )
+        else:
+            _spam_dropped += 1
+        pending_count = len(_spam_events)
+    if pending_count >= SPAM_LOG_FLUSH_SIZE:
+        # Only one request thread writes; the others keep buffering up to the cap
+        flush_spam_log(blocking=False)
+    else:
+        _start_flusher()
+
+
+def flush_spam_log(blocking=True):
+    """Write buffered SpamLog rows with one bulk insert, returns the number of rows"""
+    global _spam_events, _spam_dropped
+    if not _spam_lock.acquire(blocking=blocking):
+        return 0
+    try:
+        with _lock:
+            events, _spam_events = _spam_events, {}
+            dropped, _spam_dropped = _spam_dropped, 0
+        if dropped:
+            logger.warning(f"SpamLog buffer full, dropped {dropped} events")
+        SpamLog.objects.bulk_create(events.values())
+        return len(events)
+    finally:
+        _spam_lock.release()
+
+
+def flush_at_exit():
+    """Write what is still buffered before the process ends (atexit, gunicorn worker_exit)"""
+    for flush in (flush_ip_activity, flush_spam_log):
+        try:
+            flush()
+        except Exception as e:
+            logger.error(f"Anti-spam flush at exit failed: {e}")
+
+
+atexit.register(flush_at_exit)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        for flush in (flush_ip_activity, flush_spam_log):
+            try:
+                flush()
+            except Exception as e:
+                logger.error(f"Anti-spam flush error: {e}")
+        close_old_connections()
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is not None or not FLUSH_INTERVAL:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='antispam-flush', daemon=True)
+            _flusher.start()
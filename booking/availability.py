@@ -0,0 +1,246 @@
+"""
+Availability engine for the booking calendar.
+
+Loads studio schedule rows, time slots and confirmed bookings for a whole
+date range in a fixed number of queries and computes the status of every
+hourly slot in memory, so the cost of a calendar does not grow with the
+number of days shown.
+
+Computed days are cached per date and dropped by invalidate_availability(),
+which the model signals and admin actions call whenever a booking, time
+slot or schedule row changes. Inside a transaction the drop waits for the
+commit (invalidate_availability_on_commit), otherwise a concurrent request
+could cache the old rows again right after it. The JSON endpoint hashes
+its response body for the ETag, so it needs no version counters.
+"""
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .caching import invalidated_timeout
+from .intervals import IntervalIndex
+from .models import Booking, StudioSchedule, TimeSlot
+
+# Studio hours: 9:00 AM - 9:30 PM, one slot per hour
+STUDIO_START_HOUR = 9
+STUDIO_END_HOUR = 21
+STUDIO_HOURS = [f"{hour:02d}:00" for hour in range(STUDIO_START_HOUR, STUDIO_END_HOUR + 1)]
+
+# How many days ahead the booking page shows
+BOOKING_WINDOW_DAYS = 7
+
+# Per-date cache entries are invalidated on change, so they can live long
+AVAILABILITY_CACHE_TIMEOUT = 6 * 60 * 60  # 6 hours
+AVAILABILITY_CACHE_PREFIX = 'availability'
+
+STATUS_AVAILABLE = 'available'
+STATUS_BOOKED = 'booked'
+STATUS_BLOCKED = 'blocked'
+
+# One character per slot in the compact bitmap served by the JSON API
+SLOT_CODES = {
+    STATUS_AVAILABLE: '0',
+    STATUS_BOOKED: '1',
+    STATUS_BLOCKED: '2',
+}
+
+
+def _minutes(time_str):
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class DaySchedule:
+    """
+    Blocked and booked intervals of one day, in minutes from midnight,
+    indexed for O(log n) overlap queries.
+    """
+
+    def __init__(self, date_blocked=False, blocked=(), booked=()):
+        self.date_blocked = date_blocked
+        self.blocked = IntervalIndex(blocked)
+        self.booked = IntervalIndex(booked)
+
+    def status(self, start, end):
+        """(status, reason) of the minutes [start, end) of this day"""
+        if self.date_blocked:
+            return STATUS_BLOCKED, "Date blocked"
+        hit = self.blocked.find_overlap(start, end)
+        if hit:
+            return STATUS_BLOCKED, hit[2]
+        hit = self.booked.find_overlap(start, end)
+        if hit:
+            return STATUS_BOOKED, hit[2]
+        return STATUS_AVAILABLE, ""
+
+    def conflicts(self, start_time, duration):
+        """Whether a booking of `duration` hours starting at `start_time` overlaps anything"""
+        start = start_time.hour * 60 + start_time.minute
+        return self.status(start, start + duration * 60)[0] != STATUS_AVAILABLE
+
+    def slots(self):
+        """Status dicts for every studio hour"""
+        day = []
+        for time_str in STUDIO_HOURS:
+            start = _minutes(time_str)
+            status, reason = self.status(start, start + 60)
+            day.append({
+                'time': time_str,
+                'status': status,
+                'reason': reason,
+                'available': status == STATUS_AVAILABLE,
+            })
+        return day
+
+
+def load_day_schedules(start_date, end_date):
+    """
+    Return {date: DaySchedule} for every day from start_date to end_date
+    inclusive. Always runs three queries (schedule, time slots, confirmed
+    bookings), whatever the length of the range.
+    """
+    date_range = (start_date, end_date)
+
+    blocked_dates = set(
+        StudioSchedule.objects.filter(date__range=date_range, is_blocked=True)
+        .values_list('date', flat=True)
+    )
+
+    blocked_by_date = {}
+    booked_by_date = {}
+    time_slots = (
+        TimeSlot.objects.filter(date__range=date_range)
+        .filter(Q(is_blocked=True) | Q(is_booked=True))
+        .select_related('booking')
+    )
+    for slot in time_slots:
+        start = _minutes(slot.time)
+        if slot.is_blocked:
+            blocked_by_date.setdefault(slot.date, []).append((start, start + 60, slot.reason))
+        else:
+            reason = f"Booked by {slot.booking.name}" if slot.booking else "Booked"
+            booked_by_date.setdefault(slot.date, []).append((start, start + 60, reason))
+
+    # Each confirmed booking covers its whole duration
+    confirmed_bookings = Booking.objects.filter(
+        date__range=date_range,
+        status='confirmed'
+    ).values_list('date', 'time', 'duration')
+    for booking_date, start_time, duration in confirmed_bookings:
+        start = start_time.hour * 60 + start_time.minute
+        booked_by_date.setdefault(booking_date, []).append((start, start + duration * 60, "Booked"))
+
+    schedules = {}
+    date = start_date
+    while date <= end_date:
+        schedules[date] = DaySchedule(
+            date in blocked_dates,
+            blocked_by_date.get(date, ()),
+            booked_by_date.get(date, ()),
+        )
+        date += timedelta(days=1)
+    return schedules
+
+
+def get_day_schedule(date):
+    """Fresh (uncached) DaySchedule for one day, e.g. to validate a booking request"""
+    return load_day_schedules(date, date)[date]
+
+
+def load_availability(start_date, end_date):
+    """
+    Return {date: [slot status dicts]} for every day from start_date to
+    end_date inclusive. Past days map to an empty list.
+
+    Runs at most three queries, whatever the length of the range.
+    """
+    today = timezone.now().date()
+    availability = {}
+    date = start_date
+    while date <= end_date and date < today:
+        availability[date] = []
+        date += timedelta(days=1)
+    if date > end_date:
+        return availability
+
+    for date, schedule in load_day_schedules(date, end_date).items():
+        availability[date] = schedule.slots()
+    return availability
+
+
+def _cache_key(date):
+    return f"{AVAILABILITY_CACHE_PREFIX}:{date.isoformat()}"
+
+
+def get_cached_availability(start_date, end_date):
+    """
+    Same result as load_availability(), served from the per-date cache.
+    Days missing from the cache are loaded in one batched fetch and stored.
+    """
+    today = timezone.now().date()
+    dates = []
+    date = start_date
+    while date <= end_date:
+        dates.append(date)
+        date += timedelta(days=1)
+
+    keys = {date: _cache_key(date) for date in dates if date >= today}
+    cached = cache.get_many(keys.values())
+
+    availability = {}
+    missing = []
+    for date in dates:
+        if date < today:
+            availability[date] = []
+        elif keys[date] in cached:
+            availability[date] = cached[keys[date]]
+        else:
+            missing.append(date)
+
+    if missing:
+        loaded = load_availability(missing[0], missing[-1])
+        cache.set_many(
+            {keys[date]: times for date, times in loaded.items() if date in keys},
+            invalidated_timeout(AVAILABILITY_CACHE_TIMEOUT),
+        )
+        for date in missing:
+            availability[date] = loaded[date]
+
+    return availability
+
+
+def invalidate_availability(*dates):
+    """Drop cached availability for the given dates"""
+    dates = {date for date in dates if date}
+    if dates:
+        cache.delete_many([_cache_key(date) for date in dates])
+
+
+def invalidate_availability_on_commit(*dates):
+    """invalidate_availability() once the current transaction commits (right away outside one)"""
+    transaction.on_commit(lambda: invalidate_availability(*dates))
+
+
+def availability_bitmap(times):
+    """Encode a day's slot statuses as a string, one SLOT_CODES character per hour"""
+    return ''.join(SLOT_CODES[slot['status']] for slot in times)
+
+
+def get_day_availability(date):
+    """Slot statuses for a single day"""
+    return get_cached_availability(date, date)[date]
+
+
+def get_availability_range(start_date, end_date, include_weekends=False):
+    """
+    Calendar grid for the booking page: a list of {'date', 'times'} entries
+    for every open day from start_date to end_date, built from one batched
+    fetch. Weekends are skipped unless include_weekends is set.
+    """
+    availability = get_cached_availability(start_date, end_date)
+    return [
+        {'date': date, 'times': times}
+        for date, times in availability.items()
+        if times and (include_weekends or date.weekday() < 5)  # Monday = 0, Friday = 4
+    ]
@@ -0,0 +1,30 @@
+"""
+What CACHES['default'] can be trusted with.
+
+Several caches here (availability, blocklist, SEO, pages) are dropped on
+change instead of expiring, so they are stored for hours. That only works
+when every gunicorn worker reads the same cache (memcached on the VPS).
+LocMemCache, used by the base, prod, railway and render profiles, is private
+to each process: an invalidation reaches the worker that made the change and
+no other. On such a backend those entries are kept for LOCAL_CACHE_TIMEOUT
+seconds at most, so the other workers catch up within a minute.
+"""
+from django.conf import settings
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+LOCAL_CACHE_TIMEOUT = 60
+
+
+def is_shared_cache(alias='default'):
+    """Do all worker processes see the same entries in this cache?"""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def invalidated_timeout(timeout, alias='default'):
+    """Timeout for an entry that is dropped on change: capped when other workers cannot see the drop"""
+    if is_shared_cache(alias):
+        return timeout
+    return LOCAL_CACHE_TIMEOUT if timeout is None else min(timeout, LOCAL_CACHE_TIMEOUT)
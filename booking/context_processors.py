@@ -1,9 +1,10 @@
-from .models import SiteSEOSettings
+from .seo import get_site_seo_settings
 
 
 def seo_settings(request):
 	"""Inject global SEO & analytics settings into templates as site_seo_settings."""
-	settings_obj = SiteSEOSettings.objects.first()
+	# Process-local / shared-cache copy, no query per render
+	settings_obj = get_site_seo_settings()
 	return {
 		'site_seo_settings': settings_obj
 	}
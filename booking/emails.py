@@ -0,0 +1,154 @@
+"""
+Booking email rendering.
+
+The four templates in booking/templates/booking/email/ are compiled once per
+process and rendered against a shared context. The plain-text part is
+derived from the HTML template itself: its source is converted to text
+once, keeping the template variables, and compiled into a second template.
+Per message this costs one small extra render instead of parsing the
+rendered HTML. render_booking_emails() renders a whole batch of bookings
+with a single context, which is what the bulk admin actions use.
+"""
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import Context, Template
+from django.template.loader import get_template
+
+EMAIL_TEMPLATES = {
+    'notification': 'booking/email/booking_notification.html',
+    'pending': 'booking/email/booking_pending.html',
+    'confirmation': 'booking/email/booking_confirmed.html',
+    'rejection': 'booking/email/booking_rejected.html',
+}
+
+EMAIL_SUBJECTS = {
+    'notification': 'New Studio Booking Request from {name}',
+    'pending': 'Booking Request Received - Danov Music Studio',
+    'confirmation': 'Booking Confirmed - Danov Music Studio',
+    'rejection': 'Booking Cancelled - Danov Music Studio',
+}
+
+
+@lru_cache(maxsize=None)
+def get_email_template(kind):
+    """Compiled HTML template for an email kind, parsed once per process"""
+    return get_template(EMAIL_TEMPLATES[kind]).template
+
+
+@lru_cache(maxsize=None)
+def get_text_template(kind):
+    """Compiled plain-text template derived from the HTML template source"""
+    html_template = get_email_template(kind)
+    source = '{% autoescape off %}' + html_to_text(html_template.source) + '{% endautoescape %}'
+    return Template(source, engine=html_template.engine)
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the readable text of an email, one block element per line"""
+    SKIP_TAGS = {'head', 'style', 'script', 'title'}
+    BLOCK_TAGS = {'p', 'div', 'br', 'tr', 'h1', 'h2', 'h3', 'h4', 'ul', 'ol', 'table'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+        self.link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag == 'li':
+            self.parts.append('\n• ')
+        elif tag == 'a':
+            self.link = (dict(attrs).get('href') or '', len(self.parts))
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag == 'a' and self.link:
+            href, start = self.link
+            text = ''.join(self.parts[start:]).strip()
+            # Show the target of links whose text does not already contain it
+            if href and not href.startswith('mailto:') and href not in text:
+                self.parts.append(f' ({href})')
+            self.link = None
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(re.sub(r'\s+', ' ', data))
+
+
+def html_to_text(html):
+    """Plain-text version of an HTML email"""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return _tidy_text(''.join(extractor.parts))
+
+
+def _tidy_text(text):
+    lines = [line.strip() for line in text.splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip() + '\n'
+
+
+def _booking_context(kind, booking, base_url):
+    """Per-booking template variables on top of the shared context"""
+    context = {'booking': booking}
+    if kind == 'notification':
+        context.update({
+            'confirm_url': f"{base_url}/booking/confirm/{booking.id}/",
+            'reject_url': f"{base_url}/booking/reject/{booking.id}/",
+            'email_client_url': f"mailto:{booking.email}?subject=Re: Booking Request #{booking.id}",
+        })
+    return context
+
+
+def render_booking_emails(kind, bookings, base_url):
+    """
+    Render one email kind for many bookings in a single pass.
+    Returns a list of (subject, text, html) tuples in booking order.
+    """
+    html_template = get_email_template(kind)
+    text_template = get_text_template(kind)
+    context = Context({'base_url': base_url})
+    rendered = []
+    for booking in bookings:
+        with context.push(_booking_context(kind, booking, base_url)):
+            html = html_template.render(context)
+            text = _tidy_text(text_template.render(context))
+        subject = EMAIL_SUBJECTS[kind].format(name=booking.name)
+        rendered.append((subject, text, html))
+    return rendered
+
+
+def render_booking_email(kind, booking, base_url):
+    """(subject, text, html) for one booking"""
+    return render_booking_emails(kind, [booking], base_url)[0]
+
+
+def build_booking_emails(kind, bookings, base_url):
+    """EmailMultiAlternatives for every booking; the studio gets notifications, clients the rest"""
+    bookings = list(bookings)
+    messages = []
+    for booking, (subject, text, html) in zip(bookings, render_booking_emails(kind, bookings, base_url)):
+        to = settings.BOOKING_NOTIFICATION_EMAIL if kind == 'notification' else booking.email
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=text,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[to]
+        )
+        email.attach_alternative(html, "text/html")
+        messages.append(email)
+    return messages
+
+
+def build_booking_email(kind, booking, base_url):
+    return build_booking_emails(kind, [booking], base_url)[0]
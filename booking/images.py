@@ -0,0 +1,168 @@
+"""
+Responsive image variants.
+
+build_responsive_images() resizes every PNG/JPEG under static/images to a
+few widths and encodes each size as AVIF and WebP into
+static/images/responsive/<name>.<content hash>.<width>.<format>. The
+content hash changes with the source image, so the files can be cached
+forever. manifest.json next to them lists the variants of every source
+image; the {% picture %} tag (templatetags/responsive_images.py) reads it
+to emit <picture>/srcset markup, with the original file as the fallback.
+
+The build runs before every collectstatic (management/commands/collectstatic.py)
+and only encodes images whose content changed. Variants dropped from the
+manifest are deleted one build later, so pages rendered from the previous
+manifest (page cache, pre-rendered pages, open browser tabs) keep working
+until the next deploy. Running workers notice a rebuilt manifest by its mtime.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from django.conf import settings
+from PIL import Image, features
+
+RESPONSIVE_DIR = 'images/responsive'
+MANIFEST_NAME = 'manifest.json'
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Widths of the variants; images are never upscaled
+RESPONSIVE_WIDTHS = (480, 960, 1600)
+# Best format first: <source> order decides what the browser picks
+IMAGE_FORMATS = (
+    ('avif', 'image/avif', {'quality': 55}),
+    ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+)
+
+
+def get_static_root():
+    """The static/ source directory the images are read from and written to"""
+    return os.path.join(settings.BASE_DIR, 'static')
+
+
+def get_manifest_path(static_root=None):
+    return os.path.join(static_root or get_static_root(), RESPONSIVE_DIR, MANIFEST_NAME)
+
+
+def load_manifest(manifest_path=None):
+    """{source path: entry} of the last build, empty when it has not run yet"""
+    manifest_path = manifest_path or get_manifest_path()
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        return {}
+    return _read_manifest(manifest_path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _read_manifest(manifest_path, mtime_ns, size):
+    """Parsed manifest, read again whenever the file is rewritten"""
+    try:
+        with open(manifest_path) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _variant_names(manifest):
+    return {name for entry in manifest.values() for srcset in entry['sources'].values() for name, width in srcset}
+
+
+def find_source_images(static_root):
+    """(static path, absolute path) of every source image, plus files that look misnamed"""
+    images_dir = os.path.join(static_root, 'images')
+    responsive_dir = os.path.join(static_root, RESPONSIVE_DIR)
+    sources, misnamed = [], []
+    for root, dirs, files in os.walk(images_dir):
+        if root.startswith(responsive_dir):
+            continue
+        for name in sorted(files):
+            if name.startswith('._'):
+                continue
+            full_path = os.path.join(root, name)
+            static_path = os.path.relpath(full_path, static_root).replace(os.sep, '/')
+            if name.lower().endswith(SOURCE_EXTENSIONS):
+                sources.append((static_path, full_path))
+            elif '.' not in name or name.lower().endswith((',png', ',jpg')):
+                misnamed.append(static_path)
+    return sorted(sources), misnamed
+
+
+def variant_widths(width):
+    widths = [w for w in RESPONSIVE_WIDTHS if w < width]
+    if width <= RESPONSIVE_WIDTHS[-1]:
+        widths.append(width)
+    return widths or [RESPONSIVE_WIDTHS[-1]]
+
+
+def variant_name(static_path, digest, width, extension):
+    stem = os.path.splitext(static_path[len('images/'):])[0]
+    stem = re.sub(r'[^A-Za-z0-9]+', '-', stem).strip('-').lower()
+    return f"{RESPONSIVE_DIR}/{stem}.{digest}.{width}.{extension}"
+
+
+def build_image(static_root, static_path, full_path, digest):
+    """Encode all variants of one image. Returns its manifest entry."""
+    entry = {'hash': digest, 'sources': {}}
+    with Image.open(full_path) as image:
+        image.load()
+        entry['width'], entry['height'] = image.size
+        # AVIF/WebP keep transparency; palette images are converted first
+        mode = 'RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB'
+        image = image.convert(mode)
+        for extension, mime_type, options in IMAGE_FORMATS:
+            if not features.check(extension):
+                continue
+            srcset = []
+            for width in variant_widths(image.width):
+                height = round(image.height * width / image.width)
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                name = variant_name(static_path, digest, width, extension)
+                resized.save(os.path.join(static_root, name), extension.upper(), **options)
+                srcset.append([name, width])
+            entry['sources'][mime_type] = srcset
+    return entry
+
+
+def build_responsive_images(static_root=None, force=False, log=print):
+    """
+    Bring static/images/responsive up to date with static/images.
+    Returns (images encoded, images unchanged).
+    """
+    static_root = static_root or get_static_root()
+    os.makedirs(os.path.join(static_root, RESPONSIVE_DIR), exist_ok=True)
+    manifest_path = get_manifest_path(static_root)
+    previous = load_manifest(manifest_path)
+    reusable = {} if force else previous
+    manifest = {}
+    built = unchanged = 0
+
+    sources, misnamed = find_source_images(static_root)
+    for static_path in misnamed:
+        log(f"Skipped {static_path}: not a .png/.jpg file name")
+
+    for static_path, full_path in sources:
+        with open(full_path, 'rb') as source:
+            digest = hashlib.sha1(source.read()).hexdigest()[:10]
+        entry = reusable.get(static_path)
+        if entry and entry['hash'] == digest and all(
+            os.path.exists(os.path.join(static_root, name))
+            for srcset in entry['sources'].values() for name, width in srcset
+        ):
+            manifest[static_path] = entry
+            unchanged += 1
+            continue
+        manifest[static_path] = build_image(static_root, static_path, full_path, digest)
+        built += 1
+
+    # Variants of changed or removed images are deleted by the build after this one
+    keep = _variant_names(manifest) | _variant_names(previous)
+    responsive_dir = os.path.join(static_root, RESPONSIVE_DIR)
+    for name in os.listdir(responsive_dir):
+        if name != MANIFEST_NAME and f"{RESPONSIVE_DIR}/{name}" not in keep:
+            os.remove(os.path.join(responsive_dir, name))
+
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    _read_manifest.cache_clear()
+    return built, unchanged
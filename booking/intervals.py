@@ -0,0 +1,41 @@
+"""
+Interval index for overlap queries on a day's schedule.
+"""
+from bisect import bisect_left
+
+
+class IntervalIndex:
+    """
+    Static index over half-open intervals [start, end) with O(log n)
+    overlap queries.
+
+    Intervals are sorted by start once. For every prefix of that order the
+    index remembers the interval reaching furthest to the right, so a query
+    only has to binary-search the intervals that start before its end and
+    check whether the furthest-reaching one ends after its start.
+    """
+
+    def __init__(self, intervals=()):
+        # intervals: iterable of (start, end, payload)
+        self._items = sorted(intervals, key=lambda item: item[0])
+        self._starts = [item[0] for item in self._items]
+        self._furthest = []
+        furthest = None
+        for position, item in enumerate(self._items):
+            if furthest is None or item[1] > self._items[furthest][1]:
+                furthest = position
+            self._furthest.append(furthest)
+
+    def __len__(self):
+        return len(self._items)
+
+    def find_overlap(self, start, end):
+        """Return an (start, end, payload) interval overlapping [start, end), or None"""
+        count = bisect_left(self._starts, end)
+        if count == 0:
+            return None
+        item = self._items[self._furthest[count - 1]]
+        return item if item[1] > start else None
+
+    def overlaps(self, start, end):
+        return self.find_overlap(start, end) is not None
@@ -0,0 +1,85 @@
+"""
+Catalog of the SEO landing pages.
+
+The slugs and the per-language service texts live in data/landing_catalog.json.
+The file is read once per process and turned into a read-only mapping
+{(language, slug): LandingPage}, each entry holding the template context,
+the default SEO values and the rendered page body
+(partials/landing_content.html) of that page. The body depends only on the
+language and the slug, so it is rendered here once; per request the landing
+view only renders the shared frame (head, SEO tags, navbar, footer) around it.
+"""
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.safestring import mark_safe
+from django.utils.translation import gettext as _
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'landing_catalog.json')
+DEFAULT_LANGUAGE = 'en'
+CONTENT_TEMPLATE = 'booking/partials/landing_content.html'
+
+
+class LandingPage(NamedTuple):
+    slug: str
+    language: str
+    service_key: str
+    context: MappingProxyType
+    seo: MappingProxyType
+    content: str
+
+
+@lru_cache(maxsize=None)
+def load_catalog_data():
+    with open(CATALOG_PATH, encoding='utf-8') as catalog_file:
+        return json.load(catalog_file)
+
+
+def build_landing_page(data, language, slug, service_key):
+    services = data['services'].get(language, data['services'][DEFAULT_LANGUAGE])
+    service = services[service_key]
+    pretty = slug.replace('-', ' ').title()
+    with translation.override(language):
+        seo = {
+            'description': _('%(topic)s – professional services in Berlin. Book a session today.') % {'topic': pretty},
+            'keywords': f"{slug.replace('-', ' ')}, recording berlin, studio berlin",
+            'og_title': f"{pretty} – Danov Music Studio Berlin",
+            'og_description': _('Professional audio services in Berlin.'),
+        }
+        context = {
+            'slug': slug,
+            'service_key': service_key,
+            'service_name': service['name'],
+            'service_price': service['price'],
+            'service_desc': service['desc'],
+            'service_benefits': tuple(service['benefits']),
+        }
+        # Escaped by the template, so safe to insert as is
+        content = mark_safe(render_to_string(CONTENT_TEMPLATE, context))
+    return LandingPage(slug, language, service_key, MappingProxyType(context), MappingProxyType(seo), content)
+
+
+@lru_cache(maxsize=None)
+def get_landing_catalog():
+    """{(language, slug): LandingPage} of every catalog page in every language"""
+    data = load_catalog_data()
+    catalog = {
+        (language, slug): build_landing_page(data, language, slug, service_key)
+        for language, _name in settings.LANGUAGES
+        for slug, service_key in data['pages'].items()
+    }
+    return MappingProxyType(catalog)
+
+
+def get_landing_slugs():
+    return tuple(load_catalog_data()['pages'])
+
+
+def get_landing_page(language, slug):
+    """Catalog entry of the page, or None for a slug that is not in the catalog"""
+    return get_landing_catalog().get((language, slug))
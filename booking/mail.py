@@ -0,0 +1,113 @@
+"""
+Outbound mail connection pool.
+
+Inside a mail_session() block one open mail backend connection per thread
+is reused for every message sent through send_email() / send_bulk(), so a
+batch of messages pays the SMTP TCP + TLS + AUTH handshake once instead of
+once per message. A pooled connection idle for longer than
+MAIL_POOL_IDLE_SECONDS is closed and reopened; a shorter pause is bridged
+with a cheap NOOP liveness check. Outside a session the connection is
+closed right after sending.
+"""
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.smtp import EmailBackend as SMTPEmailBackend
+
+# Close pooled connections idle for longer than this (SMTP servers drop idle sessions)
+MAIL_POOL_IDLE_SECONDS = 60
+# Idle time after which the session is probed with NOOP before reuse
+MAIL_POOL_CHECK_SECONDS = 5
+
+_local = threading.local()
+
+
+def _new_connection():
+    connection = get_connection()
+    # Use SSL context for Mac compatibility (SMTP backend only)
+    if hasattr(settings, 'EMAIL_SSL_CONTEXT') and isinstance(connection, SMTPEmailBackend):
+        connection.ssl_context = settings.EMAIL_SSL_CONTEXT
+    return connection
+
+
+def _is_alive(connection):
+    if not isinstance(connection, SMTPEmailBackend):
+        return True
+    if connection.connection is None:
+        return False
+    try:
+        return connection.connection.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+
+def get_pooled_connection():
+    """Open (or reuse) this thread's mail connection"""
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        idle = time.monotonic() - _local.last_used
+        if idle > MAIL_POOL_IDLE_SECONDS or (idle > MAIL_POOL_CHECK_SECONDS and not _is_alive(connection)):
+            close_connection()
+            connection = None
+
+    if connection is None:
+        connection = _new_connection()
+        connection.open()
+        _local.connection = connection
+
+    _local.last_used = time.monotonic()
+    return connection
+
+
+def close_connection():
+    """Close this thread's pooled connection, if any"""
+    connection = getattr(_local, 'connection', None)
+    _local.connection = None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def send_email(message):
+    """Send one message over the pooled connection. Raises on failure."""
+    return send_bulk([message]) == 1
+
+
+def send_bulk(messages):
+    """Send messages with a single send_messages() call on the pooled connection"""
+    messages = list(messages)
+    if not messages:
+        return 0
+    connection = get_pooled_connection()
+    try:
+        sent = connection.send_messages(messages) or 0
+    except Exception:
+        # Never reuse a session in an unknown state
+        close_connection()
+        raise
+    _local.last_used = time.monotonic()
+    if not getattr(_local, 'session_depth', 0):
+        # Outside mail_session() nothing else will reuse the connection soon
+        close_connection()
+    return sent
+
+
+@contextmanager
+def mail_session():
+    """
+    Keep one pooled connection for every message sent inside the block,
+    then close it. Nested sessions share the outermost one.
+    """
+    depth = getattr(_local, 'session_depth', 0)
+    _local.session_depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.session_depth = depth
+        if depth == 0:
+            close_connection()
@@ -0,0 +1,54 @@
+import time
+from datetime import date, time as dt_time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from booking.emails import EMAIL_TEMPLATES, html_to_text, render_booking_email, render_booking_emails
+from booking.models import Booking
+
+
+class Command(BaseCommand):
+    help = "Measure per-message render cost of the booking emails (uncached, cached, batched)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help="Bookings rendered per email kind")
+        parser.add_argument('--base-url', default='https://danovmusic.com')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        base_url = options['base_url']
+        # Unsaved bookings: rendering only, no database access
+        bookings = [
+            Booking(
+                id=index + 1,
+                name=f"Client {index}",
+                email=f"client{index}@example.com",
+                phone="+49 175 413 75 18",
+                service='recording',
+                date=date(2030, 1, 1),
+                time=dt_time(10, 0),
+                duration=2,
+                message="Benchmark booking",
+            )
+            for index in range(count)
+        ]
+
+        # uncached: template lookup per message and text parsed out of the rendered HTML
+        self.stdout.write(f"{'kind':<14}{'uncached':>12}{'cached':>12}{'batch':>12}   (µs per message)")
+        for kind, template_name in EMAIL_TEMPLATES.items():
+            uncached = self.measure(lambda: [
+                html_to_text(render_to_string(template_name, {'booking': booking, 'base_url': base_url}))
+                for booking in bookings
+            ], count)
+            cached = self.measure(lambda: [
+                render_booking_email(kind, booking, base_url) for booking in bookings
+            ], count)
+            batch = self.measure(lambda: render_booking_emails(kind, bookings, base_url), count)
+            self.stdout.write(f"{kind:<14}{uncached:>12.1f}{cached:>12.1f}{batch:>12.1f}")
+
+    def measure(self, func, count):
+        func()  # warm-up: template compilation is not what is being measured
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) / count * 1_000_000
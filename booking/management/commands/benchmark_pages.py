@@ -0,0 +1,49 @@
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+DEFAULT_PATHS = [
+    f'/{lang}/{page}'
+    for lang in ('en', 'ru', 'uk', 'de')
+    for page in ('', 'about/', 'services/', 'equipment/', 'portfolio/', 'contact/', 'artists/', 'faq/')
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/sec of the marketing pages against a running server, e.g. "
+        "gunicorn --workers 3 danovmusic_studio.wsgi (start it with PAGE_CACHE_ENABLED=False for the baseline)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running server")
+        parser.add_argument('--requests', type=int, default=2000, help="Total requests")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--path', action='append', dest='paths', help="Page path (repeatable), defaults to all marketing pages")
+
+    def handle(self, *args, **options):
+        base_url = options['url'].rstrip('/')
+        paths = options['paths'] or DEFAULT_PATHS
+        total = options['requests']
+        urls = [base_url + paths[index % len(paths)] for index in range(total)]
+
+        # Warm-up: one pass over every page (fills the page cache when enabled)
+        for path in paths:
+            self.fetch(base_url + path)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            sizes = list(executor.map(self.fetch, urls))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{total} requests over {len(paths)} pages in {elapsed:.2f}s: "
+            f"{total / elapsed:.1f} req/s, {elapsed / total * 1000:.2f} ms/request, "
+            f"{sum(sizes) / total / 1024:.1f} KB/response"
+        )
+
+    def fetch(self, url):
+        with urllib.request.urlopen(url) as response:
+            return len(response.read())
@@ -0,0 +1,79 @@
+import time
+from datetime import date, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from booking.models import Booking
+from booking.ratelimit import hit
+
+
+BENCHMARK_CACHE = 'ratelimit-benchmark'
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare the per-request cost of the old COUNT(*) rate-limit query and the cache limiter as the Booking table grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000', help="Comma-separated Booking table sizes")
+        parser.add_argument('--checks', type=int, default=500, help="Rate-limit checks per measurement")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        checks = options['checks']
+        self.stdout.write(f"{'bookings':>10}{'count query':>14}{'limiter':>12}   (µs per check)")
+        # Same backend as the limiter, but under its own key prefix so live counters are not touched
+        benchmark_cache = dict(settings.CACHES[getattr(settings, 'RATELIMIT_USE_CACHE', 'default')])
+        benchmark_cache['KEY_PREFIX'] = BENCHMARK_CACHE
+        with override_settings(CACHES={**settings.CACHES, BENCHMARK_CACHE: benchmark_cache},
+                               RATELIMIT_USE_CACHE=BENCHMARK_CACHE):
+            self.run_benchmark(sizes, checks)
+
+    def run_benchmark(self, sizes, checks):
+        # Seeded rows are rolled back at the end
+        try:
+            with transaction.atomic():
+                seeded = 0
+                for size in sizes:
+                    self.seed(seeded, size)
+                    seeded = max(seeded, size)
+                    query = self.measure(lambda ip: Booking.objects.filter(
+                        ip_address=ip,
+                        created_at__gte=timezone.now() - timedelta(hours=1),
+                    ).count() >= 3, checks)
+                    limiter = self.measure(lambda ip: hit('booking', ip=ip), checks)
+                    self.stdout.write(f"{size:>10}{query:>14.1f}{limiter:>12.1f}")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def seed(self, start, end):
+        Booking.objects.bulk_create([
+            Booking(
+                name=f"Client {index}",
+                email=f"client{index}@example.com",
+                phone="+49 175 413 75 18",
+                service='recording',
+                date=date(2030, 1, 1) + timedelta(days=index % 365),
+                time=dt_time(9 + index % 12, 0),
+                duration=1,
+                ip_address=f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+            )
+            for index in range(start, end)
+        ], batch_size=1000)
+        for index in range(min(end - start, 1000)):
+            hit('booking', ip=f"10.0.{index // 256 % 256}.{index % 256}")
+
+    def measure(self, check, count):
+        ips = [f"10.0.{index // 256 % 256}.{index % 256}" for index in range(count)]
+        start = time.perf_counter()
+        for ip in ips:
+            check(ip)
+        return (time.perf_counter() - start) / count * 1_000_000
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.images import build_responsive_images
+
+
+class Command(BaseCommand):
+    help = (
+        "Encode AVIF/WebP variants of every image in static/images at several widths into "
+        "static/images/responsive (runs automatically before collectstatic)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-encode every image even if unchanged")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        built, unchanged = build_responsive_images(force=options['force'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(
+            f"{built} images encoded, {unchanged} unchanged in {time.perf_counter() - start:.1f}s"
+        ))
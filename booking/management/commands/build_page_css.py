@@ -0,0 +1,46 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import translation
+
+from booking.landing import get_landing_slugs
+from booking.management.commands.prerender_site import PAGE_NAMES
+from booking.pagecss import OUTPUT_DIR, build_page_css
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every page in every language and split static/css/style.css into per-page "
+        "bundles plus inlined critical CSS (static/css/pages). Run after changing style.css or templates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'static'), help="Static directory to write css/pages into")
+        parser.add_argument('--host', default='www.danovmusic.com', help="Host the pages are rendered for (must be in ALLOWED_HOSTS)")
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=options['host'])
+        pages_html = {}
+        for name, path in self.get_pages():
+            response = client.get(path, secure=True)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+            pages_html.setdefault(name, []).append(response.content.decode())
+
+        with open(os.path.join(settings.BASE_DIR, 'static', 'css', 'style.css'), 'rb') as source:
+            full_size = len(source.read())
+        sizes = build_page_css(pages_html, options['output'])
+        for name, (bundle, critical) in sizes.items():
+            self.stdout.write(f"{name:12} bundle {bundle / 1024:5.1f} KB, critical {critical / 1024:5.1f} KB (style.css {full_size / 1024:.1f} KB)")
+        self.stdout.write(self.style.SUCCESS(f"{len(sizes)} page bundles written to {os.path.join(options['output'], OUTPUT_DIR)}"))
+
+    def get_pages(self):
+        """(page name, path) of every page in every language; one landing page stands for all slugs"""
+        for lang, _name in settings.LANGUAGES:
+            with translation.override(lang):
+                for name in PAGE_NAMES + ['booking']:
+                    yield name, reverse(f'booking:{name}')
+                yield 'landing', reverse('booking:landing', args=[get_landing_slugs()[0]])
@@ -0,0 +1,29 @@
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from booking.storage import find_missing_static_references
+
+
+class Command(CollectStaticCommand):
+    help = (
+        "Build the responsive image variants, make sure every {% static %} path used by the "
+        "templates exists, then collect static files"
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--skip-images', action='store_true', help="Do not build the responsive image variants")
+
+    def handle(self, **options):
+        if not options['skip_images'] and not options['dry_run']:
+            call_command('build_images', stdout=self.stdout, verbosity=options['verbosity'])
+
+        missing, missing_untracked = find_missing_static_references()
+        for path, templates in missing_untracked.items():
+            self.stderr.write(f"Warning: {path} (used by {len(templates)} templates) is not in static/, copy it there before deploying")
+        if missing:
+            lines = [f"  {path}: {', '.join(templates)}" for path, templates in missing.items()]
+            raise CommandError("Templates reference static files that do not exist:\n" + "\n".join(lines))
+
+        return super().handle(**options)
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.forms.models import model_to_dict
+from django.test import Client
+from django.urls import reverse
+from django.utils import translation
+
+from booking import pagecss
+from booking.images import get_manifest_path
+from booking.pagecache import STRONGEST_COMPRESS_LEVELS, compress_variants, get_template_stamp
+from booking.seo import get_page_seo, get_site_seo_settings
+from booking.landing import get_landing_slugs
+
+# Pages that render the same for every visitor of a language
+PAGE_NAMES = ['home', 'about', 'services', 'equipment', 'gallery', 'portfolio', 'contact', 'artists', 'faq']
+MANIFEST_NAME = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render every marketing page and landing page in every language into PRERENDER_ROOT "
+        "(<path>/index.html plus .gz/.br) for nginx. Only pages whose templates or SEO data "
+        "changed since the last run are rendered again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=getattr(settings, 'PRERENDER_ROOT', None), help="Output directory")
+        parser.add_argument('--host', default='www.danovmusic.com', help="Host the pages are rendered for (must be in ALLOWED_HOSTS)")
+        parser.add_argument('--force', action='store_true', help="Render every page even if unchanged")
+
+    def handle(self, *args, **options):
+        output = options['output']
+        if not output:
+            raise CommandError("Set PRERENDER_ROOT or pass --output")
+        output = str(output)
+        os.makedirs(output, exist_ok=True)
+
+        manifest_path = os.path.join(output, MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(manifest_path) and not options['force']:
+            with open(manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+
+        # Templates, translations or the landing catalog may have changed since this process computed the stamp
+        get_template_stamp.cache_clear()
+        client = Client(HTTP_HOST=options['host'])
+        site_seo = get_site_seo_settings()
+        site_seo_data = model_to_dict(site_seo) if site_seo else None
+        static_data = self.static_manifest_hashes()
+        rendered = skipped = 0
+        pages = {}
+
+        for path, lang in self.get_pages():
+            fingerprint = self.fingerprint(path, lang, site_seo_data, static_data)
+            pages[path] = fingerprint
+            if manifest.get(path) == fingerprint and os.path.exists(self.page_file(output, path)):
+                skipped += 1
+                continue
+
+            response = client.get(path, secure=True)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+            self.write_page(output, path, response.content)
+            rendered += 1
+
+        # Pages that no longer exist are removed from disk
+        for path in set(manifest) - set(pages):
+            for suffix in ('', '.gz', '.br'):
+                page_file = self.page_file(output, path) + suffix
+                if os.path.exists(page_file):
+                    os.remove(page_file)
+
+        with open(manifest_path, 'w') as manifest_file:
+            json.dump(pages, manifest_file, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"{rendered} pages rendered, {skipped} unchanged, output in {output}"))
+
+    def get_pages(self):
+        """(path, language) of every page to export"""
+        for lang, _name in settings.LANGUAGES:
+            with translation.override(lang):
+                for name in PAGE_NAMES:
+                    yield reverse(f'booking:{name}'), lang
+                for slug in get_landing_slugs():
+                    yield reverse('booking:landing', args=[slug]), lang
+
+    def static_manifest_paths(self):
+        """Manifests that decide which static URLs and inlined CSS a page gets"""
+        paths = [finders.find(f'{pagecss.OUTPUT_DIR}/{pagecss.MANIFEST_NAME}'), get_manifest_path()]
+        if settings.STATIC_ROOT:
+            # Hashed file names written by collectstatic
+            paths.append(os.path.join(settings.STATIC_ROOT, 'staticfiles.json'))
+        return [path for path in paths if path]
+
+    def static_manifest_hashes(self):
+        """{manifest path: sha1 of its content}, None for manifests not built yet"""
+        hashes = {}
+        for path in self.static_manifest_paths():
+            try:
+                with open(path, 'rb') as manifest_file:
+                    hashes[path] = hashlib.sha1(manifest_file.read()).hexdigest()
+            except OSError:
+                hashes[path] = None
+        return hashes
+
+    def fingerprint(self, path, lang, site_seo_data, static_data):
+        """
+        Changes when any template, translation catalog (.mo), the landing catalog,
+        a static manifest (collectstatic, page CSS, responsive images), the global
+        SEO settings or this page's PageSEO row changes
+        """
+        page_seo = get_page_seo(path, lang)
+        data = {
+            'templates': get_template_stamp(),
+            'static': static_data,
+            'site_seo': site_seo_data,
+            'page_seo': model_to_dict(page_seo) if page_seo else None,
+        }
+        return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def page_file(self, output, path):
+        return os.path.join(output, path.strip('/'), 'index.html')
+
+    def write_page(self, output, path, content):
+        page_file = self.page_file(output, path)
+        os.makedirs(os.path.dirname(page_file), exist_ok=True)
+        # index.html plus index.html.gz / .br for nginx gzip_static / brotli_static
+        suffixes = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+        for encoding, body in compress_variants(content, STRONGEST_COMPRESS_LEVELS).items():
+            suffix = suffixes[encoding]
+            # Write and rename, so nginx never serves a half-written file
+            tmp_file = f"{page_file}{suffix}.tmp"
+            with open(tmp_file, 'wb') as page:
+                page.write(body)
+            os.replace(tmp_file, page_file + suffix)
@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from booking.mail import close_connection, mail_session
+from booking.models import Booking, EmailOutbox
+from booking.utils import deliver_email
+
+
+class Command(BaseCommand):
+    help = "Send emails queued in the EmailOutbox, retrying failures with exponential backoff"
+
+    # Claimed messages are hidden from other workers for this long
+    LEASE_SECONDS = 300
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process one batch and exit")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when the outbox is empty")
+        parser.add_argument('--batch-size', type=int, default=50, help="Messages claimed per batch")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            with mail_session():
+                sent, failed = self.process_batch(options['batch_size'])
+            self.stdout.write(f"Sent {sent}, failed {failed}")
+            return
+
+        self.stdout.write("Email dispatcher started")
+        try:
+            # Consecutive batches share one SMTP session
+            with mail_session():
+                while True:
+                    sent, failed = self.process_batch(options['batch_size'])
+                    if sent or failed:
+                        self.stdout.write(f"Sent {sent}, failed {failed}")
+                    else:
+                        # Do not hold an SMTP session open while the outbox is empty
+                        close_connection()
+                        time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Email dispatcher stopped")
+
+    def claim_batch(self, batch_size):
+        """Lease due messages so that concurrent workers do not send them twice"""
+        now = timezone.now()
+        with transaction.atomic():
+            messages = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            if messages:
+                EmailOutbox.objects.filter(pk__in=[message.pk for message in messages]).update(
+                    next_attempt_at=now + timedelta(seconds=self.LEASE_SECONDS)
+                )
+        return messages
+
+    def process_batch(self, batch_size):
+        sent = failed = 0
+        for message in self.claim_batch(batch_size):
+            try:
+                deliver_email(message.to_message())
+            except Exception as e:
+                message.mark_failed(e)
+                failed += 1
+                self.stderr.write(f"Failed to send email #{message.pk} (attempt {message.attempts}): {e}")
+                continue
+
+            message.mark_sent()
+            sent += 1
+            if message.kind == 'notification' and message.booking_id:
+                # update() instead of save() so the booking's status hooks do not run
+                Booking.objects.filter(pk=message.booking_id).update(
+                    email_sent=True, email_sent_at=message.sent_at
+                )
+        return sent, failed
@@ -2,7 +2,8 @@ from django.http import HttpResponseForbidden
 from django.utils import timezone
 from django.shortcuts import render
 from datetime import timedelta
-from .models import IPTracker, SpamLog, Booking
+from .antispam import get_block_reason, log_spam_attempt, record_ip_activity
+from .ratelimit import is_rate_limited
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,37 +21,31 @@ class AntiSpamMiddleware:
         client_ip = self.get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Check if IP is blocked
+        # Check if IP is blocked (blocklist and visit tracking live in the cache)
         try:
-            ip_tracker, created = IPTracker.objects.get_or_create(
-                ip_address=client_ip,
-                defaults={
-                    'booking_count': 0,
-                    'is_blocked': False
-                }
-            )
+            block_reason = get_block_reason(client_ip)
             
-            if ip_tracker.is_blocked:
-                # Log blocked attempt
-                SpamLog.objects.create(
-                    ip_address=client_ip,
+            if block_reason is not None:
+                # Log blocked attempt (buffered, repeated hits are counted)
+                log_spam_attempt(
+                    client_ip,
+                    'suspicious',
                     user_agent=user_agent,
-                    attempt_type='suspicious',
                     details=f'Blocked IP attempted access: {request.path}'
                 )
                 
                 return HttpResponseForbidden(
-                    self.render_blocked_page(request, ip_tracker.block_reason)
+                    self.render_blocked_page(request, block_reason)
                 )
             
-            # Check rate limiting for booking submissions
+            # Turn away IPs already over the booking limit; submissions are counted by the view
             if request.method == 'POST' and 'booking' in request.path:
-                if ip_tracker.is_rate_limited():
+                if is_rate_limited('booking', ip=client_ip):
                     # Log rate limit attempt
-                    SpamLog.objects.create(
-                        ip_address=client_ip,
+                    log_spam_attempt(
+                        client_ip,
+                        'rate_limit',
                         user_agent=user_agent,
-                        attempt_type='rate_limit',
                         details=f'Rate limited: {request.path}'
                     )
                     
@@ -58,8 +53,8 @@ class AntiSpamMiddleware:
                         self.render_rate_limit_page(request)
                     )
             
-            # Update IP tracker only if needed
-            # Don't save on every request to avoid database spam
+            # Written behind to IPTracker, not on every request
+            record_ip_activity(client_ip)
             
         except Exception as e:
             logger.error(f"Anti-spam middleware error: {e}")
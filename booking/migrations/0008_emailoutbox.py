@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_siteseosettings_alter_booking_options_pageseo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, max_length=30, verbose_name='Kind')),
+                ('subject', models.CharField(max_length=255, verbose_name='Subject')),
+                ('body', models.TextField(blank=True, verbose_name='Text Body')),
+                ('html_body', models.TextField(blank=True, verbose_name='HTML Body')),
+                ('from_email', models.CharField(max_length=255, verbose_name='From')),
+                ('to', models.JSONField(default=list, verbose_name='To')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.IntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Next Attempt At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='emails', to='booking.booking', verbose_name='Booking')),
+            ],
+            options={
+                'verbose_name': 'Email Outbox',
+                'verbose_name_plural': 'Email Outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='booking_ema_status_26d273_idx')],
+            },
+        ),
+    ]
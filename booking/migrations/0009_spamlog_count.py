@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spamlog',
+            name='count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Count'),
+        ),
+    ]
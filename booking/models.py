@@ -52,6 +52,14 @@ class Booking(models.Model):
     class Meta:
         verbose_name = "Booking"
         verbose_name_plural = "Bookings"
+        indexes = [
+            # Availability: status='confirmed' and a date range
+            models.Index(fields=['status', 'date'], name='booking_status_date_idx'),
+            # Bookings per IP in a time window, also narrows check_duplicate_booking to a few rows
+            models.Index(fields=['ip_address', 'created_at'], name='booking_ip_created_idx'),
+            # Admin and dashboard list newest first
+            models.Index(fields=['-created_at'], name='booking_created_desc_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.date} {self.time}"
@@ -67,63 +75,69 @@ class Booking(models.Model):
         end_datetime = start_datetime + timedelta(hours=self.duration)
         return end_datetime.time()
 
+    # Fields whose database values are remembered at load time, see get_dirty_fields()
+    TRACKED_FIELDS = ('status', 'date', 'time', 'duration')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._reset_tracker()
+
+    def _reset_tracker(self, fields=None):
+        """Take the current values as stored: all tracked fields, or only those just written"""
+        loaded = getattr(self, '_loaded_values', None)
+        if fields is None or loaded is None:
+            self._loaded_values = {name: getattr(self, name) for name in self.TRACKED_FIELDS}
+            return
+        for name in self.TRACKED_FIELDS:
+            if name in fields:
+                loaded[name] = getattr(self, name)
+
+    def get_dirty_fields(self):
+        """
+        {field: stored value} of the tracked fields changed since the booking
+        was loaded or last saved. Without a stored row (new booking) every
+        tracked field is reported, with None as the stored value.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return dict.fromkeys(self.TRACKED_FIELDS)
+        return {name: value for name, value in loaded.items() if getattr(self, name) != value}
+
     def save(self, *args, **kwargs):
-        # Check if this is an update and status changed
-        status_changed = False
-        old_status = None
+        # Changes are known from the values loaded with the instance, no extra SELECT
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        dirty = self.get_dirty_fields()
+        if update_fields is not None:
+            # Fields left out of update_fields are not written and stay dirty
+            dirty = {name: value for name, value in dirty.items() if name in update_fields}
+        old_date = dirty.get('date')
         
-        if self.pk:  # This is an update
-            try:
-                old_instance = Booking.objects.get(pk=self.pk)
-                old_status = old_instance.status
-                if self.status != old_status:
-                    status_changed = True
-            except Booking.DoesNotExist:
-                pass
-        
-        # Save the booking first
+        # Save the booking first (post_save receivers still see the dirty fields)
         super().save(*args, **kwargs)
+        self._reset_tracker(update_fields)
+        
+        # Moving a booking to another day frees the old day in the calendar cache
+        if old_date and old_date != self.date:
+            from .availability import invalidate_availability_on_commit
+            invalidate_availability_on_commit(old_date)
         
-        # Handle time slot management based on booking status
-        if self.pk:  # Only for saved bookings
-            time_str = self.time.strftime('%H:%M')
-            
-            if self.status == 'confirmed':
-                # Block time slot for confirmed bookings
-                TimeSlot.objects.get_or_create(
-                    date=self.date,
-                    time=time_str,
-                    defaults={
-                        'is_booked': True,
-                        'booking': self,
-                        'reason': f"Booked by {self.name}"
-                    }
-                )
-            else:
-                # For pending/cancelled bookings, don't block the time slot
-                # Remove any existing time slot if status changed from confirmed to pending/cancelled
-                try:
-                    existing_slot = TimeSlot.objects.get(date=self.date, time=time_str, booking=self)
-                    existing_slot.is_booked = False
-                    existing_slot.booking = None
-                    existing_slot.reason = ""
-                    existing_slot.save()
-                except TimeSlot.DoesNotExist:
-                    pass
+        # Reconcile the time slot only when status, date or time changed
+        # (a new booking that is not confirmed cannot own a slot yet)
+        if dirty.keys() & {'status', 'date', 'time'} and (self.status == 'confirmed' or not adding):
+            from .services import sync_time_slots
+            sync_time_slots([self])
         
-        # Send email notifications if status changed
-        if status_changed:
-            try:
-                from .utils import send_booking_confirmation_email, send_booking_rejection_email
-                
-                if self.status == 'confirmed':
-                    print(f"Sending confirmation email for booking {self.id}")
-                    send_booking_confirmation_email(self, None)
-                elif self.status == 'cancelled':
-                    print(f"Sending rejection email for booking {self.id}")
-                    send_booking_rejection_email(self, None)
-            except Exception as e:
-                print(f"Failed to send status change email: {e}")
+        # Status emails are sent by the caller that changed the status
+        # (admin, confirm/reject links), which has the request for absolute URLs
     
     def delete(self, *args, **kwargs):
         # Free up time slots when booking is deleted
@@ -168,15 +182,9 @@ class IPTracker(models.Model):
         self.save()
     
     def is_rate_limited(self):
-        """Check if IP is rate limited (more than 3 bookings in last hour)"""
-        from datetime import timedelta
-        one_hour_ago = timezone.now() - timedelta(hours=1)
-        recent_bookings = Booking.objects.filter(
-            ip_address=self.ip_address,
-            created_at__gte=one_hour_ago
-        ).count()
-        
-        return recent_bookings >= 3
+        """Check if IP is rate limited (sliding-window counter in the cache, see booking.ratelimit)"""
+        from .ratelimit import is_rate_limited
+        return is_rate_limited('booking', ip=self.ip_address) is not None
 
 
 class SpamLog(models.Model):
@@ -190,6 +198,7 @@ class SpamLog(models.Model):
         ('suspicious', 'Suspicious Activity'),
     ], verbose_name="Attempt Type")
     details = models.TextField(blank=True, verbose_name="Details")
+    count = models.PositiveIntegerField(default=1, verbose_name="Count")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Timestamp")
     
     class Meta:
@@ -337,6 +346,107 @@ class TimeSlot(models.Model):
             return None
 
 
+class EmailOutbox(models.Model):
+    """Outgoing email queued by the request path and sent by the send_queued_emails command"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    MAX_ATTEMPTS = 5
+    RETRY_BASE_SECONDS = 60
+    RETRY_MAX_SECONDS = 60 * 60
+    
+    kind = models.CharField(max_length=30, blank=True, verbose_name="Kind")
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails', verbose_name="Booking")
+    subject = models.CharField(max_length=255, verbose_name="Subject")
+    body = models.TextField(blank=True, verbose_name="Text Body")
+    html_body = models.TextField(blank=True, verbose_name="HTML Body")
+    from_email = models.CharField(max_length=255, verbose_name="From")
+    to = models.JSONField(default=list, verbose_name="To")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Status")
+    attempts = models.IntegerField(default=0, verbose_name="Attempts")
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Next Attempt At")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Sent At")
+    
+    class Meta:
+        verbose_name = "Email Outbox"
+        verbose_name_plural = "Email Outbox"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+    
+    @classmethod
+    def from_message(cls, email, booking=None, kind=''):
+        """Unsaved outbox row for an EmailMessage / EmailMultiAlternatives"""
+        html_body = ''
+        for content, mimetype in getattr(email, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+        return cls(
+            kind=kind,
+            booking=booking,
+            subject=email.subject,
+            body=email.body,
+            html_body=html_body,
+            from_email=email.from_email,
+            to=list(email.to),
+        )
+    
+    @classmethod
+    def enqueue(cls, email, booking=None, kind=''):
+        """Store an EmailMessage / EmailMultiAlternatives for the background dispatcher"""
+        entry = cls.from_message(email, booking=booking, kind=kind)
+        entry.save()
+        return entry
+    
+    @classmethod
+    def enqueue_many(cls, emails, bookings, kind=''):
+        """Store one email per booking with a single INSERT"""
+        return cls.objects.bulk_create([
+            cls.from_message(email, booking=booking, kind=kind) for email, booking in zip(emails, bookings)
+        ])
+    
+    def to_message(self):
+        """Rebuild the email message for sending"""
+        from django.core.mail import EmailMultiAlternatives
+        email = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to
+        )
+        if self.html_body:
+            email.attach_alternative(self.html_body, "text/html")
+        return email
+    
+    def mark_sent(self):
+        self.status = 'sent'
+        self.attempts += 1
+        self.sent_at = timezone.now()
+        self.last_error = ""
+        self.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+    
+    def mark_failed(self, error):
+        """Record a failed attempt and schedule a retry with exponential backoff"""
+        from datetime import timedelta
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = 'failed'
+        else:
+            delay = min(self.RETRY_BASE_SECONDS * 2 ** (self.attempts - 1), self.RETRY_MAX_SECONDS)
+            self.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
+
+
 # --- SEO Models ---
 class SiteSEOSettings(models.Model):
     """Глобальные SEO/Analytics настройки (минимальный системный интерфейс)."""
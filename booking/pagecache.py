@@ -0,0 +1,164 @@
+"""
+Full-page cache for the marketing pages.
+
+The output of home, about, services, ... depends only on the host, path,
+language, SEO settings, the templates and the texts they show. @cached_page
+stores the rendered bytes in the shared cache under a key made of exactly
+those, and serves later hits without entering the view or the template
+engine. Changing SiteSEOSettings / PageSEO bumps the SEO version stamps, and a
+deploy with changed templates, translations (.mo) or landing catalog changes
+the template stamp, so stale pages are never served. Logged-in users,
+requests with a query string and requests with pending flash messages always
+get a fresh render.
+
+Those version stamps live in CACHES['default'], so a bump is only seen by
+every worker when that cache is shared (memcached on the VPS). With a
+process-local backend (LocMemCache) other workers would keep serving the old
+page, so pages are not cached there at all, whatever PAGE_CACHE_ENABLED says.
+
+Each page is compressed once, when it is stored: gzip always, brotli when
+the optional brotli package is installed. Hits get the best variant the
+client accepts, so identical bodies are never recompressed per request.
+Misses are compressed at moderate levels to keep the worker's cost low;
+prerender_site, which runs offline, uses the strongest settings.
+"""
+import gzip
+import hashlib
+import os
+from functools import lru_cache, wraps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from .caching import is_shared_cache
+from .landing import CATALOG_PATH
+from .seo import PAGE_SEO_VERSION_KEY, SITE_SEO_VERSION_KEY, _get_version
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are stored
+    brotli = None
+
+PAGE_CACHE_PREFIX = 'page'
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60)
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_LENGTH = 200
+# (gzip level, brotli quality) used while serving a request / for offline builds
+COMPRESS_LEVELS = (6, 5)
+STRONGEST_COMPRESS_LEVELS = (9, 11)
+
+
+def get_page_source_files():
+    """Files besides the views that shape the rendered pages"""
+    for root, dirs, files in os.walk(TEMPLATES_DIR):
+        for name in files:
+            yield os.path.join(root, name)
+    # {% trans %} / gettext strings
+    for locale_dir in settings.LOCALE_PATHS:
+        for root, dirs, files in os.walk(locale_dir):
+            for name in files:
+                if name.endswith('.mo'):
+                    yield os.path.join(root, name)
+    yield CATALOG_PATH
+
+
+@lru_cache(maxsize=None)
+def get_template_stamp():
+    """
+    Changes whenever a template, a compiled translation catalog or the
+    landing catalog changes (computed once per process)
+    """
+    latest = 0
+    for path in get_page_source_files():
+        latest = max(latest, os.stat(path).st_mtime_ns)
+    return latest
+
+
+def get_seo_version():
+    return f"{_get_version(SITE_SEO_VERSION_KEY)}.{_get_version(PAGE_SEO_VERSION_KEY)}"
+
+
+def page_cache_key(request):
+    lang = (getattr(request, 'LANGUAGE_CODE', 'en') or 'en').split('-')[0]
+    location = hashlib.md5(f"{request.scheme}://{request.get_host()}{request.path}".encode()).hexdigest()
+    return f"{PAGE_CACHE_PREFIX}:{get_template_stamp()}:{get_seo_version()}:{lang}:{location}"
+
+
+def is_cacheable_request(request):
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True) or not is_shared_cache():
+        return False
+    if request.method not in ('GET', 'HEAD') or request.GET:
+        return False
+    # Both checks are free for visitors without a session cookie
+    if request.user.is_authenticated:
+        return False
+    return not len(get_messages(request))
+
+
+def compress_variants(content, levels=COMPRESS_LEVELS):
+    """{content-coding: body} of a page, compressed once"""
+    variants = {'identity': content}
+    if len(content) < COMPRESS_MIN_LENGTH:
+        return variants
+    gzip_level, brotli_quality = levels
+    compressed = {'gzip': gzip.compress(content, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(content, quality=brotli_quality)
+    for encoding, body in compressed.items():
+        if len(body) < len(content):
+            variants[encoding] = body
+    return variants
+
+
+def accepted_encodings(request):
+    """Content-codings the client accepts (q > 0) from Accept-Encoding"""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def variant_response(request, content_type, variants):
+    """Response with the smallest stored variant the client accepts"""
+    accepted = accepted_encodings(request)
+    encoding = next((
+        coding for coding in ('br', 'gzip')
+        if coding in variants and (coding in accepted or '*' in accepted)
+    ), 'identity')
+    response = HttpResponse(variants[encoding], content_type=content_type)
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(variants[encoding]))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def cached_page(view):
+    """Serve the view's rendered page from the shared cache when possible"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            return variant_response(request, *cached)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return response
+        cached = (response['Content-Type'], compress_variants(response.content))
+        cache.set(key, cached, PAGE_CACHE_TIMEOUT)
+        return variant_response(request, *cached)
+    return wrapper
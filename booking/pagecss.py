@@ -0,0 +1,230 @@
+"""
+Per-page CSS bundles with inlined critical CSS.
+
+style.css holds the styles of every page, and each page loads all of it
+render-blocking. manage.py build_page_css renders every page, keeps only
+the rules whose selectors match its markup, and writes per page
+(static/css/pages/):
+
+    <page>.css            every rule the page uses, loaded without blocking rendering
+    <page>.critical.css   the part used by the navbar and the first section,
+                          inlined into <head> by {% page_css %}
+
+manifest.json records a hash of style.css, main.js and the templates the
+bundles were built from. When any of them changed since, or in DEBUG,
+{% page_css %} falls back to the full style.css, so a stale bundle can never
+leave an element unstyled.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+SOURCE_CSS = 'css/style.css'
+SOURCE_JS = 'js/main.js'
+OUTPUT_DIR = 'css/pages'
+MANIFEST_NAME = 'manifest.json'
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+# Classes only ever added by Bootstrap's JavaScript
+DYNAMIC_CLASSES = frozenset({
+    'show', 'showing', 'hiding', 'active', 'fade', 'collapse', 'collapsing', 'collapsed',
+    'modal-open', 'modal-backdrop', 'dropdown-menu-end', 'was-validated',
+})
+
+PSEUDO_RE = re.compile(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+ID_RE = re.compile(r'#(-?[A-Za-z_][\w-]*)')
+TAG_RE = re.compile(r'(?:^|[\s>+~(])([A-Za-z][\w-]*)')
+HTML_TAG_RE = re.compile(r'<([A-Za-z][\w-]*)')
+HTML_CLASS_RE = re.compile(r'\sclass="([^"]*)"')
+HTML_ID_RE = re.compile(r'\sid="([^"]*)"')
+SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script>', re.S)
+WORD_RE = re.compile(r'[A-Za-z_][\w-]*')
+
+
+class PageTokens:
+    """Tags, classes and ids a page can contain"""
+
+    def __init__(self, tags=(), classes=(), ids=()):
+        self.tags = set(tags)
+        self.classes = set(classes)
+        self.ids = set(ids)
+
+    @classmethod
+    def from_html(cls, html, script_words=()):
+        tokens = cls(
+            tags={tag.lower() for tag in HTML_TAG_RE.findall(html)} | {'html', 'body'},
+            classes={name for value in HTML_CLASS_RE.findall(html) for name in value.split()},
+            ids=set(HTML_ID_RE.findall(html)),
+        )
+        # Anything a script mentions may become a class or id at runtime
+        words = set(script_words) | DYNAMIC_CLASSES
+        for script in SCRIPT_RE.findall(html):
+            words.update(WORD_RE.findall(script))
+        tokens.classes |= words
+        tokens.ids |= words
+        return tokens
+
+    def update(self, other):
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+
+
+def split_blocks(css):
+    """Top-level (prelude, body) pairs of a stylesheet; body is None for statements like @import"""
+    blocks = []
+    position = 0
+    while position < len(css):
+        brace = css.find('{', position)
+        semicolon = css.find(';', position)
+        if brace == -1 and semicolon == -1:
+            break
+        if semicolon != -1 and (brace == -1 or semicolon < brace):
+            blocks.append((css[position:semicolon].strip(), None))
+            position = semicolon + 1
+            continue
+        depth = 1
+        end = brace + 1
+        while end < len(css) and depth:
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+            end += 1
+        blocks.append((css[position:brace].strip(), css[brace + 1:end - 1]))
+        position = end
+    return blocks
+
+
+def split_selectors(prelude):
+    """'a, b:not(.c, .d)' -> ['a', 'b:not(.c, .d)']"""
+    selectors, depth, current = [], 0, ''
+    for char in prelude:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and not depth:
+            selectors.append(current.strip())
+            current = ''
+            continue
+        current += char
+    selectors.append(current.strip())
+    return [selector for selector in selectors if selector]
+
+
+def selector_matches(selector, tokens):
+    """Could the selector match an element of the page? (pseudo-classes and attributes are ignored)"""
+    simple = ATTRIBUTE_RE.sub('', PSEUDO_RE.sub('', selector))
+    return (
+        all(name in tokens.classes for name in CLASS_RE.findall(simple))
+        and all(name in tokens.ids for name in ID_RE.findall(simple))
+        and all(tag.lower() in tokens.tags for tag in TAG_RE.findall(simple))
+    )
+
+
+def minify(css):
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};,>])\s*', r'\1', css).replace(';}', '}').strip()
+
+
+def filter_css(blocks, tokens):
+    """Minified CSS of the rules used on a page, in their original order"""
+    output = []
+    for prelude, body in blocks:
+        if body is None:
+            output.append(f"{prelude};")
+        elif prelude.startswith(('@media', '@supports')):
+            inner = filter_css(split_blocks(body), tokens)
+            if inner:
+                output.append(f"{minify(prelude)}{{{inner}}}")
+        elif prelude.startswith('@'):
+            # @font-face, @keyframes: small and referenced by name only
+            output.append(minify(f"{prelude}{{{body}}}"))
+        else:
+            used = [selector for selector in split_selectors(prelude) if selector_matches(selector, tokens)]
+            if used:
+                output.append(minify(f"{','.join(used)}{{{body}}}"))
+    return ''.join(output)
+
+
+def above_the_fold(html):
+    """Markup up to the end of the first <section>: navbar and hero"""
+    end = html.find('</section>')
+    return html if end == -1 else html[:end]
+
+
+def read_static(path):
+    full_path = finders.find(path)
+    if full_path is None:
+        return None
+    with open(full_path, encoding='utf-8', errors='replace') as static_file:
+        return static_file.read().replace('\0', '')
+
+
+def compute_source_hash():
+    """Changes when style.css, main.js or any template changes"""
+    digest = hashlib.sha1()
+    for path in (SOURCE_CSS, SOURCE_JS):
+        digest.update((read_static(path) or '').encode())
+    for root, dirs, files in sorted(os.walk(TEMPLATES_DIR)):
+        for name in sorted(files):
+            with open(os.path.join(root, name), 'rb') as template_file:
+                digest.update(name.encode() + template_file.read())
+    return digest.hexdigest()[:12]
+
+
+def build_page_css(pages_html, output_root):
+    """
+    Write the bundles of {page name: [rendered html, ...]} (one html per language)
+    to output_root/css/pages. Returns {page name: (bundle bytes, critical bytes)}.
+    """
+    blocks = split_blocks(re.sub(r'/\*.*?\*/', '', read_static(SOURCE_CSS), flags=re.S))
+    script_words = WORD_RE.findall(read_static(SOURCE_JS) or '')
+    output_dir = os.path.join(output_root, OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    manifest = {'source': compute_source_hash(), 'pages': {}}
+    sizes = {}
+    for name, html_list in sorted(pages_html.items()):
+        tokens, critical_tokens = PageTokens(), PageTokens()
+        for html in html_list:
+            tokens.update(PageTokens.from_html(html, script_words))
+            critical_tokens.update(PageTokens.from_html(above_the_fold(html), script_words))
+        files = {
+            'bundle': (f"{OUTPUT_DIR}/{name}.css", filter_css(blocks, tokens)),
+            'critical': (f"{OUTPUT_DIR}/{name}.critical.css", filter_css(blocks, critical_tokens)),
+        }
+        for path, css in files.values():
+            with open(os.path.join(output_root, path), 'w', encoding='utf-8') as css_file:
+                css_file.write(css + '\n')
+        manifest['pages'][name] = {kind: path for kind, (path, css) in files.items()}
+        sizes[name] = tuple(len(css.encode()) for path, css in files.values())
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    get_page_css.cache_clear()
+    return sizes
+
+
+@lru_cache(maxsize=None)
+def get_page_css(name):
+    """(critical css, bundle static path) of a page, or None when it has no current bundle"""
+    if settings.DEBUG or not name:
+        return None
+    manifest = read_static(f"{OUTPUT_DIR}/{MANIFEST_NAME}")
+    if manifest is None:
+        return None
+    manifest = json.loads(manifest)
+    page = manifest['pages'].get(name)
+    if page is None or manifest['source'] != compute_source_hash():
+        return None
+    critical = read_static(page['critical'])
+    if critical is None:
+        return None
+    return critical.strip(), page['bundle']
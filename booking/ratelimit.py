@@ -0,0 +1,113 @@
+"""
+Sliding-window rate limiter backed by the cache.
+
+Each (endpoint, identifier) pair keeps one counter per fixed window; the
+count over the last `window` seconds is estimated from the current and the
+previous window, weighted by how far the current window has progressed.
+hit() bumps the counters with atomic cache.add()/cache.incr() first and
+compares the returned count to the limit, so concurrent requests cannot all
+pass a check made before any of them was counted. It costs a few cache
+calls whatever the size of the Booking table.
+
+Limits are configured per endpoint in settings.RATE_LIMITS, e.g.
+
+    RATE_LIMITS = {
+        'booking': {'ip': (3, 3600), 'email': (3, 3600), 'phone': (3, 3600)},
+    }
+
+meaning at most 3 hits per hour for each IP, email and phone number.
+"""
+import hashlib
+import re
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_RATE_LIMITS = {
+    'booking': {'ip': (3, 3600), 'email': (3, 3600), 'phone': (3, 3600)},
+}
+
+
+def _cache():
+    return caches[getattr(settings, 'RATELIMIT_USE_CACHE', 'default')]
+
+
+def _limits(endpoint):
+    if not getattr(settings, 'RATELIMIT_ENABLE', True):
+        return {}
+    return getattr(settings, 'RATE_LIMITS', DEFAULT_RATE_LIMITS).get(endpoint, {})
+
+
+def _normalize(name, value):
+    value = str(value).strip().lower()
+    if name == 'phone':
+        value = re.sub(r'\D', '', value)
+    return value
+
+
+def _keys(endpoint, name, value, window, now):
+    digest = hashlib.sha1(_normalize(name, value).encode()).hexdigest()
+    base = f"ratelimit:{endpoint}:{name}:{digest}"
+    current = int(now // window)
+    return f"{base}:{current}", f"{base}:{current - 1}", (now % window) / window
+
+
+def _tracked(endpoint, identifiers):
+    limits = _limits(endpoint)
+    for name, value in identifiers.items():
+        if value and name in limits:
+            limit, window = limits[name]
+            yield name, value, limit, window
+
+
+def get_hit_count(endpoint, name, value, window, now=None):
+    """Estimated number of hits in the last `window` seconds"""
+    current_key, previous_key, elapsed = _keys(endpoint, name, value, window, now or time.time())
+    counts = _cache().get_many([current_key, previous_key])
+    return counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+
+
+def _incr(cache, key, timeout):
+    """Add one to the counter and return the new value"""
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def hit(endpoint, **identifiers):
+    """
+    Count one hit for every configured identifier (ip, email, phone, ...) of
+    the endpoint. Returns the name of the first one that is now over its
+    limit, or None when the request may go through.
+    """
+    cache = _cache()
+    now = time.time()
+    tracked = [
+        (name, limit, window) + _keys(endpoint, name, value, window, now)
+        for name, value, limit, window in _tracked(endpoint, identifiers)
+    ]
+    previous_counts = cache.get_many([previous_key for *_, previous_key, elapsed in tracked])
+    limited_by = None
+    for name, limit, window, current_key, previous_key, elapsed in tracked:
+        # Keep the counter for two windows: it is the "previous" window next time
+        count = _incr(cache, current_key, window * 2)
+        if limited_by is None and previous_counts.get(previous_key, 0) * (1 - elapsed) + count > limit:
+            limited_by = name
+    return limited_by
+
+
+def is_rate_limited(endpoint, **identifiers):
+    """
+    Name of the first identifier that has reached its limit, or None.
+    Read-only status for display; requests are limited through hit().
+    """
+    now = time.time()
+    for name, value, limit, window in _tracked(endpoint, identifiers):
+        if get_hit_count(endpoint, name, value, window, now) >= limit:
+            return name
+    return None
@@ -0,0 +1,126 @@
+"""
+Cached SEO configuration.
+
+SiteSEOSettings is a single row that changes a few times a year but is read
+on every page render. It is kept per process and in the shared cache under a
+version stamp; a save or delete bumps the version (see signals.py), so every
+worker reloads it on its next render while steady-state renders cost one
+cache read and no queries.
+
+PageSEO overrides are handled the same way: all rows are loaded once into a
+dict keyed by (normalized path, language) and looked up in O(1) by every
+page view through apply_page_seo().
+"""
+import time
+from django.core.cache import cache
+from .models import PageSEO, SiteSEOSettings
+
+SEO_CACHE_TIMEOUT = 24 * 60 * 60
+SITE_SEO_CACHE_PREFIX = 'seo:site-settings'
+SITE_SEO_VERSION_KEY = 'seo:site-settings-version'
+PAGE_SEO_CACHE_PREFIX = 'seo:page-index'
+PAGE_SEO_VERSION_KEY = 'seo:page-index-version'
+
+# (version, value) pairs of this process, each replaced as a whole
+_site_seo = (None, None)
+_page_seo_index = (None, {})
+
+
+def _get_version(key):
+    """Current version stamp, started from the time in milliseconds when missing"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No stamp yet: the next _get_version() starts a fresh one
+        pass
+
+
+def get_site_seo_settings():
+    """The SiteSEOSettings row, or None when it has not been created yet"""
+    global _site_seo
+    version = _get_version(SITE_SEO_VERSION_KEY)
+    local_version, settings_obj = _site_seo
+    if local_version == version:
+        return settings_obj
+
+    key = f"{SITE_SEO_CACHE_PREFIX}:{version}"
+    # Cached as a 1-tuple so that "no row" is cached too
+    cached = cache.get(key)
+    if cached is None:
+        cached = (SiteSEOSettings.objects.first(),)
+        cache.set(key, cached, SEO_CACHE_TIMEOUT)
+
+    _site_seo = (version, cached[0])
+    return cached[0]
+
+
+def invalidate_site_seo_settings():
+    _bump_version(SITE_SEO_VERSION_KEY)
+
+
+def normalize_seo_path(path):
+    """'/en/services' and 'en/services/' both become '/en/services/'"""
+    path = path.strip().strip('/')
+    return f"/{path}/" if path else '/'
+
+
+def get_page_seo_index():
+    """{(normalized path, language): PageSEO} of every override"""
+    global _page_seo_index
+    version = _get_version(PAGE_SEO_VERSION_KEY)
+    local_version, index = _page_seo_index
+    if local_version == version:
+        return index
+
+    key = f"{PAGE_SEO_CACHE_PREFIX}:{version}"
+    index = cache.get(key)
+    if index is None:
+        index = {
+            (normalize_seo_path(page_seo.path), page_seo.language): page_seo
+            for page_seo in PageSEO.objects.all()
+        }
+        cache.set(key, index, SEO_CACHE_TIMEOUT)
+
+    _page_seo_index = (version, index)
+    return index
+
+
+def get_page_seo(path, language):
+    """
+    PageSEO for a request path, or None. An entry for the exact path
+    (/en/services/) wins over a language-independent one (/services/).
+    """
+    index = get_page_seo_index()
+    if not index:
+        return None
+    path = normalize_seo_path(path)
+    page_seo = index.get((path, language))
+    prefix = f"/{language}/"
+    if page_seo is None and path.startswith(prefix):
+        page_seo = index.get((path[len(prefix) - 1:], language))
+    return page_seo
+
+
+def apply_page_seo(seo, path, language):
+    """Override a view's default SEO values with the matching PageSEO row (in place)"""
+    page_seo = get_page_seo(path, language)
+    if page_seo:
+        for field in ('description', 'keywords', 'og_title', 'og_description'):
+            value = getattr(page_seo, field)
+            if value:
+                seo[field] = value
+        if page_seo.og_image_url:
+            seo['og_image'] = page_seo.og_image_url
+    return seo
+
+
+def invalidate_page_seo_index():
+    _bump_version(PAGE_SEO_VERSION_KEY)
@@ -0,0 +1,106 @@
+"""
+Bulk booking operations used by the admin actions.
+
+A status change is applied to the whole selection with one UPDATE, the
+TimeSlot table is reconciled with one bulk_create / bulk_update and the
+client emails are stored in the outbox with one INSERT for the
+send_queued_emails worker, so acting on hundreds of bookings costs a fixed
+handful of queries.
+"""
+from django.db import transaction
+from .availability import invalidate_availability_on_commit
+from .models import Booking, TimeSlot
+from .utils import queue_booking_emails
+
+# Email sent to the client when a booking enters the status
+STATUS_EMAILS = {
+    'confirmed': 'confirmation',
+    'cancelled': 'rejection',
+}
+
+
+def _slot_time(booking):
+    return booking.time.strftime('%H:%M')
+
+
+def sync_time_slots(bookings):
+    """Give confirmed bookings their TimeSlot and release the slots held by the others"""
+    confirmed = [booking for booking in bookings if booking.status == 'confirmed']
+    released = [booking for booking in bookings if booking.status != 'confirmed']
+    new_slots = []
+    changed_slots = []
+
+    if released:
+        for slot in TimeSlot.objects.filter(booking__in=released):
+            slot.is_booked = False
+            slot.booking = None
+            slot.reason = ""
+            changed_slots.append(slot)
+
+    if confirmed:
+        existing = {
+            (slot.date, slot.time): slot
+            for slot in TimeSlot.objects.filter(
+                date__in={booking.date for booking in confirmed},
+                time__in={_slot_time(booking) for booking in confirmed},
+            )
+        }
+        for booking in confirmed:
+            key = (booking.date, _slot_time(booking))
+            slot = existing.get(key)
+            if slot is None:
+                slot = TimeSlot(
+                    date=booking.date,
+                    time=key[1],
+                    is_booked=True,
+                    booking=booking,
+                    reason=f"Booked by {booking.name}",
+                )
+                existing[key] = slot
+                new_slots.append(slot)
+            elif slot.booking_id is None and not slot.is_booked and not slot.is_blocked:
+                # Slot left over from an earlier cancellation
+                slot.is_booked = True
+                slot.booking = booking
+                slot.reason = f"Booked by {booking.name}"
+                changed_slots.append(slot)
+
+    if new_slots:
+        TimeSlot.objects.bulk_create(new_slots, ignore_conflicts=True)
+    if changed_slots:
+        TimeSlot.objects.bulk_update(changed_slots, ['is_booked', 'booking', 'reason'])
+
+
+def transition_bookings(queryset, new_status, request=None):
+    """
+    Move every booking of the queryset that is not already in new_status to it.
+    With a request, the matching client emails are queued. Returns the changed bookings.
+    """
+    with transaction.atomic():
+        bookings = list(queryset.exclude(status=new_status).select_for_update())
+        if not bookings:
+            return []
+
+        Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).update(status=new_status)
+        for booking in bookings:
+            booking.status = new_status
+            booking._reset_tracker()
+
+        sync_time_slots(bookings)
+
+        if request is not None and new_status in STATUS_EMAILS:
+            queue_booking_emails(STATUS_EMAILS[new_status], bookings, request)
+
+    # Bulk updates send no signals, so the calendar cache is dropped here
+    invalidate_availability_on_commit(*{booking.date for booking in bookings})
+    return bookings
+
+
+def delete_bookings(queryset):
+    """Release the TimeSlots of the bookings and delete them. Returns the number deleted."""
+    with transaction.atomic():
+        pks = list(queryset.values_list('pk', flat=True))
+        TimeSlot.objects.filter(booking__in=pks).update(is_booked=False, booking=None, reason="")
+        # post_delete drops the cached calendar day of every deleted booking
+        _, deleted = Booking.objects.filter(pk__in=pks).delete()
+    return deleted.get(Booking._meta.label, 0)
@@ -1,35 +1,45 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Booking
-from .utils import send_booking_confirmation_email, send_booking_rejection_email
+from .antispam import invalidate_blocklist
+from .availability import invalidate_availability_on_commit
+from .models import Booking, IPTracker, PageSEO, SiteSEOSettings, StudioSchedule, TimeSlot
+from .seo import invalidate_page_seo_index, invalidate_site_seo_settings
 
 
 @receiver(post_save, sender=Booking)
-def booking_status_changed(sender, instance, created, **kwargs):
-    """Send email notifications when booking status changes"""
-    if not created:  # Only for updates, not new bookings
-        try:
-            # Check if status changed by comparing with the instance's previous state
-            if hasattr(instance, '_state') and hasattr(instance._state, 'fields_cache'):
-                # Get the previous status from the instance's state
-                old_status = instance._state.fields_cache.get('status', 'pending')
-            else:
-                # Fallback: get from database
-                try:
-                    old_instance = Booking.objects.get(pk=instance.pk)
-                    old_status = old_instance.status
-                except Booking.DoesNotExist:
-                    old_status = 'pending'
-            
-            # Check if status changed
-            if instance.status != old_status:
-                print(f"Status changed from {old_status} to {instance.status} for booking {instance.id}")
-                
-                if instance.status == 'confirmed':
-                    # Send confirmation email to client
-                    send_booking_confirmation_email(instance, None)
-                elif instance.status == 'cancelled':
-                    # Send rejection email to client
-                    send_booking_rejection_email(instance, None)
-        except Exception as e:
-            print(f"Failed to send status change email: {e}")
+def booking_saved(sender, instance, created, **kwargs):
+    """Drop the cached calendar day only when status, date, time or duration changed"""
+    # Status emails are sent by the admin and the confirm/reject views, not here
+    if created or instance.get_dirty_fields():
+        invalidate_availability_on_commit(instance.date)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_delete, sender=TimeSlot)
+@receiver(post_save, sender=StudioSchedule)
+@receiver(post_delete, sender=StudioSchedule)
+def availability_changed(sender, instance, **kwargs):
+    """Drop the cached calendar day touched by a booking, time slot or schedule change"""
+    invalidate_availability_on_commit(instance.date)
+
+
+@receiver(post_save, sender=IPTracker)
+@receiver(post_delete, sender=IPTracker)
+def ip_tracker_changed(sender, instance, **kwargs):
+    """Reload the cached blocklist after an IP is blocked, unblocked or removed"""
+    invalidate_blocklist()
+
+
+@receiver(post_save, sender=SiteSEOSettings)
+@receiver(post_delete, sender=SiteSEOSettings)
+def site_seo_settings_changed(sender, instance, **kwargs):
+    """Make every worker reload the global SEO settings on its next render"""
+    invalidate_site_seo_settings()
+
+
+@receiver(post_save, sender=PageSEO)
+@receiver(post_delete, sender=PageSEO)
+def page_seo_changed(sender, instance, **kwargs):
+    """Make every worker reload the PageSEO override index on its next lookup"""
+    invalidate_page_seo_index()
@@ -0,0 +1,71 @@
+"""
+Static file storage and template reference check.
+
+collectstatic writes every file under a content-hashed name
+(style.3f2a9c81d4e7.css) plus .gz/.br copies next to it. WhiteNoise and
+nginx serve the hashed names with "Cache-Control: public, immutable" for a
+year; a changed file gets a new name, so browsers never see stale assets.
+
+find_missing_static_references() scans the templates for
+{% static '...' %} paths that no static directory provides. The
+collectstatic command (management/commands/collectstatic.py) fails on them
+before anything is deployed.
+"""
+import logging
+import os
+import re
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+STATIC_TAG_RE = re.compile(r"""{%\s*static\s+(['"])(?P<path>[^'"]+)\1\s*%}""")
+
+
+class ManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Hashed and precompressed files. A file missing at runtime keeps its plain URL instead of failing the page."""
+    manifest_strict = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing_names = set()
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            # Without collectstatic (Vercel) every file is missing: warn once per file, not per render
+            if name not in self.missing_names:
+                self.missing_names.add(name)
+                logger.warning("Static file %s is missing, served without a hash", name)
+            return name
+
+
+def get_static_references():
+    """{static path: [templates referencing it]} of every literal {% static %} path"""
+    references = {}
+    for root, dirs, files in os.walk(TEMPLATES_DIR):
+        for name in files:
+            template_path = os.path.join(root, name)
+            with open(template_path, encoding='utf-8') as template_file:
+                for match in STATIC_TAG_RE.finditer(template_file.read()):
+                    template = os.path.relpath(template_path, TEMPLATES_DIR).replace(os.sep, '/')
+                    references.setdefault(match.group('path'), []).append(template)
+    return references
+
+
+def find_missing_static_references():
+    """
+    ({path: templates} of references no static directory provides,
+     {path: templates} of missing files listed in STATIC_UNTRACKED_FILES)
+    """
+    untracked = set(getattr(settings, 'STATIC_UNTRACKED_FILES', ()))
+    missing, missing_untracked = {}, {}
+    for path, templates in sorted(get_static_references().items()):
+        if finders.find(path) is None:
+            (missing_untracked if path in untracked else missing)[path] = sorted(set(templates))
+    return missing, missing_untracked
@@ -0,0 +1,31 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from booking.pagecss import SOURCE_CSS, get_page_css
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_css(context):
+    """
+    Inline critical CSS plus the page's bundle loaded without blocking rendering
+    (see booking/pagecss.py), or the full style.css when the page has no current bundle.
+    """
+    request = context.get('request')
+    match = getattr(request, 'resolver_match', None)
+    page = get_page_css(match.url_name if match else None)
+    if page is None:
+        return format_html('<link href="{}" rel="stylesheet">', static(SOURCE_CSS))
+
+    critical, bundle = page
+    bundle_url = static(bundle)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link href="{}" rel="stylesheet"></noscript>',
+        # Built from our own style.css
+        mark_safe(critical), bundle_url, bundle_url,
+    )
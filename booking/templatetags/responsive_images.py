@@ -0,0 +1,30 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from booking.images import load_manifest
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(path, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    <picture> with AVIF/WebP srcsets from the build_images manifest and the
+    original image as fallback, e.g. {% picture 'images/gallery2.png' alt="Control room" class="img-fluid" %}.
+    Images missing from the manifest get a plain <img>.
+    """
+    entry = load_manifest().get(path)
+    img_attrs = {'src': static(path), 'alt': alt, 'loading': loading, 'decoding': 'async'}
+    if entry:
+        img_attrs['width'], img_attrs['height'] = entry['width'], entry['height']
+    img_attrs.update(attrs)
+    img = format_html('<img {}>', format_html_join(' ', '{}="{}"', img_attrs.items()))
+    if not entry:
+        return img
+
+    sources = format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+        (mime_type, ', '.join(f"{static(name)} {width}w" for name, width in srcset), sizes)
+        for mime_type, srcset in entry['sources'].items()
+    ))
+    return format_html('<picture>{}{}</picture>', sources, img)
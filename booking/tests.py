@@ -1,3 +1,894 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.shortcuts import render as render_shortcut
+from django.template import Context, Template, engines
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .availability import STUDIO_HOURS, get_availability_range, get_day_availability, get_day_schedule, load_availability
+from . import antispam, pagecache
+from .antispam import flush_ip_activity, flush_spam_log, get_block_reason, log_spam_attempt, record_ip_activity
+from .emails import render_booking_email, render_booking_emails
+from .images import build_responsive_images, load_manifest
+from .intervals import IntervalIndex
+from .landing import get_landing_catalog, get_landing_page
+from .pagecss import PageTokens, above_the_fold, filter_css, split_blocks
+from .warmup import get_template_names, warm_templates
+from . import mail as mail_pool
+from .seo import get_page_seo, get_site_seo_settings
+from .services import delete_bookings, transition_bookings
+from .storage import ManifestStaticFilesStorage, find_missing_static_references
+from .ratelimit import get_hit_count, hit, is_rate_limited
+from .models import Booking, EmailOutbox, IPTracker, PageSEO, SiteSEOSettings, SpamLog, StudioSchedule, TimeSlot
+
+
+def make_booking(date, start, duration=1, status='pending', **extra):
+    """Create a booking without going through the email side effects"""
+    fields = {
+        'name': 'Test Client',
+        'email': 'client@example.com',
+        'phone': '+49 175 413 75 18',
+        'service': 'recording',
+        'date': date,
+        'time': start,
+        'duration': duration,
+        'status': status,
+    }
+    fields.update(extra)
+    return Booking.objects.create(**fields)
+
+
+class AvailabilityEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.tomorrow = self.today + timedelta(days=1)
+
+    def test_query_count_is_flat_across_horizon(self):
+        for days in (7, 90):
+            with self.assertNumQueries(3):
+                load_availability(self.today, self.today + timedelta(days=days - 1))
+
+    def test_statuses(self):
+        make_booking(self.tomorrow, time(10, 0), duration=3, status='confirmed')
+        TimeSlot.block_time_slot(self.tomorrow, '18:00', reason="Maintenance")
+        StudioSchedule.block_date(self.tomorrow + timedelta(days=1), reason="Holiday")
+
+        day = {slot['time']: slot for slot in get_day_availability(self.tomorrow)}
+        self.assertEqual(len(day), len(STUDIO_HOURS))
+        self.assertEqual(day['09:00']['status'], 'available')
+        for hour in ('10:00', '11:00', '12:00'):
+            self.assertEqual(day[hour]['status'], 'booked')
+        self.assertEqual(day['13:00']['status'], 'available')
+        self.assertEqual(day['18:00']['status'], 'blocked')
+        self.assertEqual(day['18:00']['reason'], "Maintenance")
+
+        blocked_day = get_day_availability(self.tomorrow + timedelta(days=1))
+        self.assertTrue(all(slot['status'] == 'blocked' for slot in blocked_day))
+
+    def test_past_days_are_empty(self):
+        yesterday = self.today - timedelta(days=1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_day_availability(yesterday), [])
+
+    def test_cache_is_invalidated_on_change(self):
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'available')
+        with self.assertNumQueries(0):
+            get_day_availability(self.tomorrow)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            slot = TimeSlot.block_time_slot(self.tomorrow, '09:00')
+            # Dropped only after the commit: a reader before it would cache the old rows again
+            self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'available')
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'blocked')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            slot.delete()
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'available')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StudioSchedule.block_date(self.tomorrow)
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'blocked')
+
+    def test_admin_unblock_with_filter_invalidates(self):
+        StudioSchedule.block_date(self.tomorrow)
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'blocked')
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        # Run from the "blocked = yes" changelist, which no longer matches after the update
+        response = self.client.post(f'/en/{settings.ADMIN_URL}booking/studioschedule/?is_blocked__exact=1', {
+            'action': 'unblock_selected_dates',
+            '_selected_action': [StudioSchedule.objects.get().pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(get_day_availability(self.tomorrow)[0]['status'], 'available')
+
+    def test_range_skips_weekends(self):
+        with self.assertNumQueries(3):
+            grid = get_availability_range(self.today, self.today + timedelta(days=13))
+        self.assertTrue(all(entry['date'].weekday() < 5 for entry in grid))
+        self.assertEqual(len(grid), 10)
+
+
+class IntervalIndexTests(TestCase):
+    def test_overlaps(self):
+        index = IntervalIndex([(600, 960, 'long'), (540, 600, 'early'), (1080, 1140, 'late')])
+        self.assertEqual(index.find_overlap(780, 840)[2], 'long')
+        self.assertEqual(index.find_overlap(540, 570)[2], 'early')
+        self.assertIsNone(index.find_overlap(960, 1080))
+        self.assertIsNone(index.find_overlap(0, 540))
+        self.assertTrue(index.overlaps(1000, 1100))
+        self.assertFalse(IntervalIndex().overlaps(0, 1440))
+
+    def test_multi_hour_booking_conflicts(self):
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        make_booking(tomorrow, time(10, 0), duration=6, status='confirmed')
+        day = get_day_schedule(tomorrow)
+        self.assertTrue(day.conflicts(time(15, 0), 1))
+        self.assertTrue(day.conflicts(time(8, 0), 3))
+        self.assertFalse(day.conflicts(time(16, 0), 2))
+
+
+class BookingViewTests(TestCase):
+    def setUp(self):
+        # Warm-up request, so both measured requests start from the same state
+        self.client.get('/en/booking/')
+
+    def booking_page_queries(self, window_days):
+        cache.clear()
+        with mock.patch('booking.views.BOOKING_WINDOW_DAYS', window_days):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get('/en/booking/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_post_rejects_overlap_with_multi_hour_booking(self):
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        make_booking(tomorrow, time(10, 0), duration=6, status='confirmed')
+        response = self.client.post('/en/booking/', {
+            'name': 'Second Client',
+            'email': 'second@example.com',
+            'phone': '+49 175 413 75 19',
+            'service': 'mixing',
+            'date': tomorrow.isoformat(),
+            'time': '14:00',
+            'duration': 1,
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_query_count_does_not_depend_on_window(self):
+        self.assertEqual(self.booking_page_queries(7), self.booking_page_queries(60))
+
+
+class AvailabilityApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        self.url = f'/api/availability/?from={self.tomorrow.isoformat()}&to={self.tomorrow.isoformat()}'
+
+    def test_bitmap_and_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['days'][self.tomorrow.isoformat()], '0' * len(STUDIO_HOURS))
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Another worker (own LocMemCache) derives the same tag from the same data
+        cache.clear()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TimeSlot.block_time_slot(self.tomorrow, '09:00')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTrue(response.json()['days'][self.tomorrow.isoformat()].startswith('20'))
+
+    def test_invalid_range(self):
+        self.assertEqual(self.client.get('/api/availability/?from=tomorrow').status_code, 400)
+        self.assertEqual(self.client.get('/api/availability/?from=2030-01-01&to=2031-01-01').status_code, 400)
+
+
+class EmailOutboxTests(TestCase):
+    booking_data = {
+        'name': 'Outbox Client',
+        'email': 'outbox@example.com',
+        'phone': '+49 175 413 75 19',
+        'service': 'mixing',
+        'time': '11:00',
+        'duration': 1,
+    }
+
+    def test_booking_post_only_enqueues(self):
+        data = dict(self.booking_data, date=(timezone.now().date() + timedelta(days=1)).isoformat())
+        response = self.client.post('/en/booking/', data, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('kind', flat=True)),
+            ['notification', 'pending'],
+        )
+
+        call_command('send_queued_emails', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+        self.assertTrue(Booking.objects.get().email_sent)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        message = EmailOutbox.objects.create(subject='Hi', body='Body', from_email='a@example.com', to=['b@example.com'])
+        with mock.patch('booking.management.commands.send_queued_emails.deliver_email', side_effect=OSError('down')):
+            call_command('send_queued_emails', '--once', stdout=StringIO(), stderr=StringIO())
+        message.refresh_from_db()
+        self.assertEqual(message.status, 'pending')
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+
+        message.attempts = EmailOutbox.MAX_ATTEMPTS - 1
+        message.mark_failed('still down')
+        self.assertEqual(message.status, 'failed')
+
+
+class MailPoolTests(TestCase):
+    def messages(self, count):
+        return [EmailMessage('Subject', 'Body', 'studio@example.com', [f'client{i}@example.com']) for i in range(count)]
+
+    def test_session_reuses_one_connection(self):
+        with mock.patch.object(mail_pool, '_new_connection', wraps=mail_pool._new_connection) as new_connection:
+            with mail_pool.mail_session():
+                for message in self.messages(3):
+                    mail_pool.send_email(message)
+                self.assertEqual(mail_pool.send_bulk(self.messages(5)), 5)
+            self.assertEqual(new_connection.call_count, 1)
+
+            for message in self.messages(2):
+                mail_pool.send_email(message)
+            self.assertEqual(new_connection.call_count, 3)
+        self.assertEqual(len(mail.outbox), 10)
+
+
+class EmailRenderingTests(TestCase):
+    def test_text_part_is_derived_from_html(self):
+        booking = Booking(
+            id=7, name='Ann & Co', email='ann@example.com', phone='+49 175 413 75 18', service='mixing',
+            date=timezone.now().date(), time=time(10, 0), duration=2,
+        )
+        subject, text, html = render_booking_email('notification', booking, 'https://example.com')
+        self.assertEqual(subject, 'New Studio Booking Request from Ann & Co')
+        self.assertIn('Ann &amp; Co', html)
+        self.assertIn('Ann & Co', text)
+        self.assertIn('https://example.com/booking/confirm/7/', text)
+        self.assertNotIn('<div', text)
+
+        batch = render_booking_emails('notification', [booking, booking], 'https://example.com')
+        self.assertEqual(batch, [(subject, text, html)] * 2)
+
+
+class AntiSpamStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        flush_ip_activity()
+        flush_spam_log()
+
+    def test_page_views_do_not_touch_database(self):
+        get_block_reason('203.0.113.5')  # loads the blocklist once
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertIsNone(get_block_reason('203.0.113.5'))
+                record_ip_activity('203.0.113.5')
+
+        self.assertEqual(flush_ip_activity(), 1)
+        self.assertTrue(IPTracker.objects.filter(ip_address='203.0.113.5').exists())
+
+    def test_buffers_are_written_at_exit(self):
+        record_ip_activity('203.0.113.8')
+        log_spam_attempt('203.0.113.8', 'suspicious')
+        antispam.flush_at_exit()
+        self.assertEqual(antispam._pending, {})
+        self.assertEqual(antispam._spam_events, {})
+        self.assertTrue(IPTracker.objects.filter(ip_address='203.0.113.8').exists())
+        self.assertTrue(SpamLog.objects.filter(ip_address='203.0.113.8').exists())
+
+    def test_blocking_invalidates_cached_blocklist(self):
+        self.assertIsNone(get_block_reason('203.0.113.6'))
+        IPTracker.objects.create(ip_address='203.0.113.6', is_blocked=True, block_reason='Spam')
+        self.assertEqual(get_block_reason('203.0.113.6'), 'Spam')
+        response = self.client.get('/en/', REMOTE_ADDR='203.0.113.6')
+        self.assertEqual(response.status_code, 403)
+
+    def test_spam_log_is_aggregated_and_bounded(self):
+        with self.assertNumQueries(0):
+            for _ in range(50):
+                log_spam_attempt('203.0.113.7', 'suspicious', details='Blocked IP attempted access: /en/')
+            log_spam_attempt('203.0.113.7', 'duplicate')
+        self.assertEqual(flush_spam_log(), 2)
+        self.assertEqual(SpamLog.objects.get(attempt_type='suspicious').count, 50)
+
+        with mock.patch.object(antispam, 'SPAM_LOG_FLUSH_SIZE', 100), \
+                mock.patch.object(antispam, 'SPAM_LOG_MAX_PENDING', 3):
+            for index in range(10):
+                log_spam_attempt(f'203.0.113.{100 + index}', 'suspicious')
+            self.assertEqual(len(antispam._spam_events), 3)
+            self.assertEqual(flush_spam_log(), 3)
+
+
+class RateLimitTests(TestCase):
+    booking_data = {
+        'name': 'Busy Client',
+        'email': 'busy@example.com',
+        'phone': '+49 175 413 75 19',
+        'service': 'mixing',
+        'duration': 1,
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sliding_window_counts_previous_window(self):
+        for _ in range(3):
+            self.assertIsNone(hit('booking', email='Busy@Example.com '))
+        self.assertEqual(is_rate_limited('booking', email='busy@example.com'), 'email')
+        self.assertEqual(hit('booking', ip='198.51.100.1', email='busy@example.com'), 'email')
+        self.assertIsNone(hit('booking', ip='198.51.100.1', email='other@example.com'))
+        # Half-way through the next window half of the old hits still count
+        now = (time_module.time() // 3600 + 1.5) * 3600
+        self.assertAlmostEqual(get_hit_count('booking', 'email', 'busy@example.com', 3600, now), 2)
+
+    def test_concurrent_hits_cannot_all_pass(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda index: hit('booking', email='busy@example.com'), range(8)))
+        self.assertEqual(results.count(None), 3)
+
+    def test_check_does_not_query_database(self):
+        with self.assertNumQueries(0):
+            hit('booking', ip='198.51.100.2', email='busy@example.com', phone='+49 175')
+
+    def test_booking_view_limits_email_across_ips(self):
+        tomorrow = timezone.now().date() + timedelta(days=1)
+        for index, hour in enumerate(['10:00', '11:00', '12:00', '13:00']):
+            response = self.client.post(
+                '/en/booking/',
+                dict(self.booking_data, date=tomorrow.isoformat(), time=hour),
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+                REMOTE_ADDR=f'198.51.100.{10 + index}',
+            )
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(Booking.objects.count(), 3)
+
+    def test_invalid_submissions_do_not_use_ip_quota(self):
+        for _ in range(5):
+            response = self.client.post('/en/booking/', {'name': 'Busy Client'}, REMOTE_ADDR='198.51.100.20')
+            self.assertEqual(response.status_code, 200)
+        self.assertIsNone(is_rate_limited('booking', ip='198.51.100.20'))
+
+        for _ in range(3):
+            hit('booking', ip='198.51.100.20')
+        response = self.client.post('/en/booking/', {'name': 'Busy Client'}, REMOTE_ADDR='198.51.100.20')
+        self.assertEqual(response.status_code, 403)
+
+
+class BookingQueryPlanTests(TestCase):
+    """The hot Booking queries must be answered from an index, not a full table scan"""
+    SEED_BOOKINGS = 100_000
+
+    @classmethod
+    def setUpTestData(cls):
+        start = timezone.now().date() - timedelta(days=365)
+        now = timezone.now()
+        Booking.objects.bulk_create([
+            Booking(
+                name=f'Client {index}',
+                email=f'client{index % 5000}@example.com',
+                phone=f'+49 175 {index % 5000:07d}',
+                service='recording',
+                date=start + timedelta(days=index % 730),
+                time=time(9 + index % 12, 0),
+                status=('pending', 'confirmed', 'cancelled')[index % 3],
+                ip_address=f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}',
+                created_at=now - timedelta(minutes=index),
+            )
+            for index in range(cls.SEED_BOOKINGS)
+        ], batch_size=2000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            # e.g. "SEARCH booking_booking USING INDEX booking_status_date_idx (status=? AND date>? AND date<?)"
+            table_lines = [line for line in plan.splitlines() if 'booking_booking' in line]
+            self.assertTrue(table_lines, plan)
+            for line in table_lines:
+                self.assertIn('INDEX', line, plan)
+        elif connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan on booking_booking', plan, plan)
+        else:
+            self.skipTest(f'No plan assertions for {connection.vendor}')
+        self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_seeded_created_at_is_kept(self):
+        # created_at is a plain default (not auto_now_add), so bulk_create keeps the spread-out
+        # seed times and the window queries below are planned against realistic data
+        recent = Booking.objects.filter(created_at__gte=timezone.now() - timedelta(hours=1)).count()
+        self.assertTrue(0 < recent <= 60, recent)
+
+    def test_confirmed_bookings_in_date_range(self):
+        today = timezone.now().date()
+        self.assertUsesIndex(Booking.objects.filter(
+            date__range=(today, today + timedelta(days=6)), status='confirmed'
+        ).values_list('date', 'time', 'duration'))
+
+    def test_bookings_per_ip_in_window(self):
+        self.assertUsesIndex(Booking.objects.filter(
+            ip_address='10.0.1.2', created_at__gte=timezone.now() - timedelta(hours=1)
+        ))
+
+    def test_duplicate_check(self):
+        today = timezone.now().date()
+        self.assertUsesIndex(Booking.objects.filter(
+            ip_address='10.0.1.2',
+            email='client12@example.com',
+            phone='+49 175 0000012',
+            date=today,
+            time=time(10, 0),
+            created_at__gte=timezone.now() - timedelta(minutes=10),
+        ))
+
+    def test_newest_first_listing(self):
+        self.assertUsesIndex(Booking.objects.order_by('-created_at')[:25])
+
+
+class BookingChangeTrackingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tomorrow = timezone.now().date() + timedelta(days=1)
+        make_booking(self.tomorrow, time(10, 0))
+        self.booking = Booking.objects.get()
+
+    def test_status_change_query_count(self):
+        self.booking.status = 'confirmed'
+        self.assertEqual(self.booking.get_dirty_fields(), {'status': 'pending'})
+        # UPDATE booking, SELECT the day's slots, INSERT the new slot
+        with self.assertNumQueries(3):
+            self.booking.save()
+        self.assertEqual(self.booking.get_dirty_fields(), {})
+        self.assertTrue(TimeSlot.objects.filter(booking=self.booking, is_booked=True).exists())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_untracked_change_is_a_single_update(self):
+        self.booking.message = 'Bring a guitar'
+        with self.assertNumQueries(1):
+            self.booking.save()
+
+    def test_update_fields_keeps_other_fields_dirty(self):
+        self.booking.status = 'confirmed'
+        self.booking.time = time(11, 0)
+        self.booking.save(update_fields=['status'])
+        self.assertEqual(self.booking.get_dirty_fields(), {'time': time(10, 0)})
+        self.booking.save()
+        self.assertEqual(Booking.objects.get().time, time(11, 0))
+        self.assertTrue(TimeSlot.objects.filter(booking=self.booking, time='11:00', is_booked=True).exists())
+
+    def test_admin_status_change_queues_one_email(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        created_at = timezone.localtime(self.booking.created_at)
+        response = self.client.post(f'/en/{settings.ADMIN_URL}booking/booking/{self.booking.pk}/change/', {
+            'name': self.booking.name,
+            'email': self.booking.email,
+            'phone': self.booking.phone,
+            'service': self.booking.service,
+            'date': self.tomorrow.isoformat(),
+            'time': '10:00',
+            'duration': 1,
+            'created_at_0': created_at.date().isoformat(),
+            'created_at_1': created_at.strftime('%H:%M:%S'),
+            'status': 'confirmed',
+            'spam_score': 0,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.get().status, 'confirmed')
+        # Queued for the outbox worker, nothing is sent during the request
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(
+            list(EmailOutbox.objects.values_list('kind', 'booking', 'to', 'status')),
+            [('confirmation', self.booking.pk, [self.booking.email], 'pending')],
+        )
+
+
+class BookingTransitionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        start = timezone.now().date() + timedelta(days=1)
+        Booking.objects.bulk_create([
+            Booking(
+                name=f'Client {index}',
+                email=f'client{index}@example.com',
+                phone='+49 175 413 75 18',
+                service='recording',
+                date=start + timedelta(days=index // 12),
+                time=time(9 + index % 12, 0),
+            )
+            for index in range(200)
+        ])
+        self.request = RequestFactory().get('/admin/')
+
+    def test_bulk_confirm_takes_constant_queries(self):
+        # SELECT ... FOR UPDATE, UPDATE, SELECT slots, INSERT slots, INSERT outbox
+        # (SQLite splits the INSERTs into a few batches, a save() per booking would be 1000+)
+        with CaptureQueriesContext(connection) as queries:
+            confirmed = transition_bookings(Booking.objects.all(), 'confirmed', self.request)
+        self.assertLessEqual(len(queries), 15)
+        self.assertEqual(len(confirmed), 200)
+        self.assertEqual(TimeSlot.objects.filter(is_booked=True).count(), 200)
+        self.assertEqual(EmailOutbox.objects.filter(kind='confirmation').count(), 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Cancelling releases the slots, confirming again takes them back
+        transition_bookings(Booking.objects.filter(pk__lte=10), 'cancelled', self.request)
+        self.assertEqual(TimeSlot.objects.filter(is_booked=True).count(), 190)
+        transition_bookings(Booking.objects.filter(status='cancelled'), 'confirmed')
+        self.assertEqual(TimeSlot.objects.filter(is_booked=True).count(), 200)
+        self.assertEqual(transition_bookings(Booking.objects.all(), 'confirmed'), [])
+
+    def test_delete_releases_slots(self):
+        transition_bookings(Booking.objects.all(), 'confirmed')
+        self.assertEqual(delete_bookings(Booking.objects.filter(pk__lte=5)), 5)
+        self.assertEqual(TimeSlot.objects.filter(is_booked=True).count(), 195)
+        self.assertEqual(TimeSlot.objects.filter(booking__isnull=True, is_booked=False).count(), 5)
+
+
+class SEOSettingsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_settings_are_cached_and_invalidated_on_save(self):
+        self.assertIsNone(get_site_seo_settings())
+        settings_obj = SiteSEOSettings.objects.create(ga4_measurement_id='G-TEST', gtag_enabled=True)
+        self.assertEqual(get_site_seo_settings().ga4_measurement_id, 'G-TEST')
+        with self.assertNumQueries(0):
+            get_site_seo_settings()
+
+        settings_obj.ga4_measurement_id = 'G-NEW'
+        settings_obj.save()
+        self.assertEqual(get_site_seo_settings().ga4_measurement_id, 'G-NEW')
+
+    def test_page_render_does_not_query_seo_settings(self):
+        self.client.get('/en/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/en/')
+        self.assertFalse([query for query in queries if 'siteseosettings' in query['sql']])
+
+    def test_page_seo_index_lookup_and_refresh(self):
+        PageSEO.objects.create(path='/services', language='de', description='Generic services')
+        PageSEO.objects.create(path='/de/services/', language='de', description='German services')
+        self.assertEqual(get_page_seo('/de/services/', 'de').description, 'German services')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_page_seo('/en/services/', 'de'), None)
+            self.assertEqual(get_page_seo('/de/services', 'de').description, 'German services')
+
+        PageSEO.objects.filter(path='/de/services/').delete()
+        self.assertEqual(get_page_seo('/de/services/', 'de').description, 'Generic services')
+
+        response = self.client.get('/de/services/')
+        self.assertContains(response, '<meta name="description" content="Generic services">')
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Stands in for memcached: pages are only cached when all workers share the cache
+        patcher = mock.patch.object(pagecache, 'is_shared_cache', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stamp_covers_translations_and_landing_catalog(self):
+        files = {os.path.relpath(path, settings.BASE_DIR) for path in pagecache.get_page_source_files()}
+        self.assertIn(os.path.join('booking', 'templates', 'booking', 'landing.html'), files)
+        self.assertIn(os.path.join('locale', 'de', 'LC_MESSAGES', 'django.mo'), files)
+        self.assertIn(os.path.join('booking', 'data', 'landing_catalog.json'), files)
+
+    def test_second_hit_skips_the_view(self):
+        first = self.client.get('/en/services/')
+        with mock.patch('booking.views.render') as render:
+            second = self.client.get('/en/services/')
+        render.assert_not_called()
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(second['Content-Language'], 'en')
+
+        # Another language is another page
+        with mock.patch('booking.views.render', wraps=render_shortcut) as render:
+            self.client.get('/de/services/')
+        render.assert_called_once()
+
+    def test_process_local_cache_is_not_used(self):
+        with mock.patch.object(pagecache, 'is_shared_cache', return_value=False):
+            self.client.get('/en/services/')
+            with mock.patch('booking.views.render', wraps=render_shortcut) as render:
+                self.client.get('/en/services/')
+        render.assert_called_once()
+
+    def test_seo_change_and_login_bypass_the_cache(self):
+        self.client.get('/en/about/')
+        PageSEO.objects.create(path='/en/about/', language='en', description='Fresh description')
+        self.assertContains(self.client.get('/en/about/'), 'Fresh description')
+
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        with mock.patch('booking.views.render', wraps=render_shortcut) as render:
+            self.client.get('/en/about/')
+        render.assert_called_once()
+
+    def test_compressed_variants_follow_accept_encoding(self):
+        plain = self.client.get('/en/faq/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        compressed = self.client.get('/en/faq/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertLess(len(compressed.content), len(plain.content))
+        self.assertNotIn('Content-Encoding', self.client.get('/en/faq/', HTTP_ACCEPT_ENCODING='gzip;q=0'))
+
+        # Brotli is preferred when the optional package is installed
+        cache.clear()
+        fake_brotli = mock.Mock()
+        fake_brotli.compress.return_value = b'br-body'
+        with mock.patch.object(pagecache, 'brotli', fake_brotli):
+            response = self.client.get('/en/faq/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual((response['Content-Encoding'], response.content), ('br', b'br-body'))
+        # Misses are compressed at a moderate level, not brotli 11
+        self.assertEqual(fake_brotli.compress.call_args.kwargs, {'quality': pagecache.COMPRESS_LEVELS[1]})
+
+
+class LandingCatalogTests(TestCase):
+    def test_catalog_lookup(self):
+        page = get_landing_page('de', 'mixing-services-berlin')
+        self.assertIs(page, get_landing_catalog()[('de', 'mixing-services-berlin')])
+        self.assertEqual((page.service_key, page.context['service_price']), ('mixing', 'ab 200€'))
+        with self.assertRaises(TypeError):
+            page.context['service_name'] = 'Changed'
+        # The page body is rendered once, in the page's language
+        self.assertIn('/de/booking/?service=mixing', page.content)
+        self.assertIn('ab 200€', page.content)
+
+        self.assertIsNone(get_landing_page('en', 'unknown-slug'))
+
+    def test_landing_view(self):
+        cache.clear()
+        PageSEO.objects.create(path='/ru/landing/mastering-berlin/', language='ru', og_title='Мастеринг в Берлине')
+        response = self.client.get('/ru/landing/mastering-berlin/')
+        self.assertContains(response, 'Громко, чисто и готово к релизу на платформах.')
+        self.assertEqual(response.context['seo']['og_title'], 'Мастеринг в Берлине')
+        # The override does not leak into the shared catalog entry
+        self.assertNotEqual(get_landing_page('ru', 'mastering-berlin').seo['og_title'], 'Мастеринг в Берлине')
+
+    def test_unknown_slug_is_not_cached(self):
+        cache.clear()
+        with mock.patch.object(pagecache, 'is_shared_cache', return_value=True), \
+                mock.patch.object(pagecache.cache, 'set') as cache_set:
+            self.assertEqual(self.client.get('/en/landing/no-such-page/').status_code, 404)
+        stored = [call.args[0] for call in cache_set.call_args_list]
+        self.assertFalse([key for key in stored if key.startswith(f'{pagecache.PAGE_CACHE_PREFIX}:')])
+
+
+class GettextPageTests(TestCase):
+    def test_single_template_per_language(self):
+        cache.clear()
+        self.assertContains(self.client.get('/de/contact/'), 'Nachricht senden')
+        self.assertContains(self.client.get('/ru/booking/'), 'Отправить запрос')
+        response = self.client.get('/uk/faq/')
+        self.assertTemplateUsed(response, 'booking/faq.html')
+        # Translations in the FAQ JSON-LD stay valid JSON
+        html = response.content.decode()
+        start = html.index('"@type": "FAQPage"')
+        faq = json.loads(html[html.rindex('{', 0, start):html.index('</script>', start)])
+        self.assertEqual(faq['mainEntity'][0]['name'], 'Як забронювати сесію?')
+        self.assertIn("зв'яжіться", faq['mainEntity'][1]['acceptedAnswer']['text'])
+
+
+class PrerenderSiteTests(TestCase):
+    def test_incremental_export(self):
+        cache.clear()
+        with tempfile.TemporaryDirectory() as output:
+            out = StringIO()
+            call_command('prerender_site', '--output', output, stdout=out)
+            with open(os.path.join(output, 'manifest.json')) as manifest_file:
+                page_count = len(json.load(manifest_file))
+            self.assertIn(f'{page_count} pages rendered, 0 unchanged', out.getvalue())
+            with open(os.path.join(output, 'de', 'faq', 'index.html'), encoding='utf-8') as page:
+                self.assertIn('<html', page.read())
+            self.assertTrue(os.path.exists(os.path.join(output, 'en', 'landing', 'mixing-berlin', 'index.html.gz')))
+
+            # Only the page with the new PageSEO row is rendered again
+            PageSEO.objects.create(path='/en/faq/', language='en', description='Updated FAQ')
+            out = StringIO()
+            call_command('prerender_site', '--output', output, stdout=out)
+            self.assertIn(f'1 pages rendered, {page_count - 1} unchanged', out.getvalue())
+            with open(os.path.join(output, 'en', 'faq', 'index.html'), encoding='utf-8') as page:
+                self.assertIn('Updated FAQ', page.read())
+
+    def test_translation_change_renders_again(self):
+        cache.clear()
+        with tempfile.TemporaryDirectory() as output:
+            # Stands in for a locale/*/django.mo or the landing catalog
+            source = os.path.join(output, 'django.mo')
+            open(source, 'wb').close()
+            with mock.patch.object(pagecache, 'get_page_source_files', return_value=[source]):
+                call_command('prerender_site', '--output', output, stdout=StringIO())
+                os.utime(source, ns=(time_module.time_ns(), time_module.time_ns() + 10 ** 9))
+                out = StringIO()
+                call_command('prerender_site', '--output', output, stdout=out)
+            self.assertIn(' 0 unchanged', out.getvalue())
+        pagecache.get_template_stamp.cache_clear()
+
+    def test_static_manifest_change_renders_again(self):
+        cache.clear()
+        with tempfile.TemporaryDirectory() as output:
+            # Stands in for staticfiles.json or a page CSS / responsive image manifest
+            static_manifest = os.path.join(output, 'staticfiles.json')
+            with open(static_manifest, 'w') as manifest_file:
+                manifest_file.write('{"paths": {}}')
+            with mock.patch(
+                'booking.management.commands.prerender_site.Command.static_manifest_paths',
+                return_value=[static_manifest],
+            ):
+                call_command('prerender_site', '--output', output, stdout=StringIO())
+                with open(static_manifest, 'w') as manifest_file:
+                    manifest_file.write('{"paths": {"css/style.css": "css/style.0123456789ab.css"}}')
+                out = StringIO()
+                call_command('prerender_site', '--output', output, stdout=out)
+            self.assertIn(' 0 unchanged', out.getvalue())
+
+
+class TemplateWarmupTests(TestCase):
+    def test_warm_templates(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        names = get_template_names()
+        self.assertIn('booking/email/booking_pending.html', names)
+
+        compiled, elapsed = warm_templates()
+        self.assertEqual(compiled, len(names))
+        self.assertIn('booking/home_en.html', loader.get_template_cache)
+        self.assertIn('booking/partials/footer_de.html', loader.get_template_cache)
+
+
+class ResponsiveImageTests(TestCase):
+    def test_build_and_picture_tag(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as static_root:
+            os.makedirs(os.path.join(static_root, 'images'))
+            Image.new('RGB', (1000, 500), 'purple').save(os.path.join(static_root, 'images', 'Studio Room.png'))
+            open(os.path.join(static_root, 'images', 'Broken,png'), 'wb').close()
+
+            skipped = []
+            self.assertEqual(build_responsive_images(static_root, log=skipped.append), (1, 0))
+            self.assertEqual(skipped, ["Skipped images/Broken,png: not a .png/.jpg file name"])
+            manifest_path = os.path.join(static_root, 'images', 'responsive', 'manifest.json')
+            entry = load_manifest(manifest_path)['images/Studio Room.png']
+            self.assertEqual((entry['width'], entry['height']), (1000, 500))
+            webp = entry['sources']['image/webp']
+            self.assertEqual([width for name, width in webp], [480, 960, 1000])
+            self.assertRegex(webp[0][0], r'^images/responsive/studio-room\.[0-9a-f]{10}\.480\.webp$')
+            self.assertTrue(os.path.exists(os.path.join(static_root, webp[0][0])))
+
+            # Unchanged images are not encoded again
+            self.assertEqual(build_responsive_images(static_root, log=skipped.append), (0, 1))
+
+            # Superseded variants survive one build, for pages rendered from the old manifest
+            Image.new('RGB', (1000, 500), 'orange').save(os.path.join(static_root, 'images', 'Studio Room.png'))
+            self.assertEqual(build_responsive_images(static_root, log=skipped.append), (1, 0))
+            self.assertNotEqual(load_manifest(manifest_path)['images/Studio Room.png'], entry)
+            self.assertTrue(os.path.exists(os.path.join(static_root, webp[0][0])))
+            self.assertEqual(build_responsive_images(static_root, log=skipped.append), (0, 1))
+            self.assertFalse(os.path.exists(os.path.join(static_root, webp[0][0])))
+
+            # A manifest rebuilt by another process is picked up without a restart
+            with open(manifest_path, 'w') as manifest_file:
+                json.dump({}, manifest_file)
+            os.utime(manifest_path, ns=(time_module.time_ns(), time_module.time_ns() + 10 ** 9))
+            self.assertEqual(load_manifest(manifest_path), {})
+            build_responsive_images(static_root, log=skipped.append)
+
+            with mock.patch('booking.templatetags.responsive_images.load_manifest', lambda: load_manifest(manifest_path)):
+                html = Template(
+                    "{% load responsive_images %}{% picture 'images/Studio Room.png' alt='Room' class='img-fluid' %}"
+                    "{% picture 'images/missing.png' alt='Missing' %}"
+                ).render(Context())
+            self.assertIn('<source type="image/webp" srcset="/static/images/responsive/studio-room.', html)
+            self.assertIn('960.webp 960w', html)
+            self.assertIn('<img src="/static/images/Studio%20Room.png" alt="Room" loading="lazy" decoding="async" width="1000" height="500" class="img-fluid"></picture>', html)
+            self.assertIn('<img src="/static/images/missing.png" alt="Missing" loading="lazy" decoding="async">', html)
+
+
+class StaticReferenceTests(TestCase):
+    def test_templates_reference_existing_files(self):
+        missing, missing_untracked = find_missing_static_references()
+        self.assertEqual(missing, {})
+
+    @override_settings(STATIC_UNTRACKED_FILES=['videos/gg3.mp4'])
+    def test_collectstatic_fails_on_missing_file(self):
+        references = {'css/style.css': ['booking/base.html'], 'images/missing.png': ['booking/home_en.html']}
+        with mock.patch('booking.storage.get_static_references', return_value=references):
+            self.assertEqual(find_missing_static_references(), ({'images/missing.png': ['booking/home_en.html']}, {}))
+            with self.assertRaisesMessage(CommandError, 'images/missing.png: booking/home_en.html'):
+                call_command('collectstatic', '--skip-images', '--noinput', stdout=StringIO())
+
+    def test_missing_file_keeps_plain_url(self):
+        with tempfile.TemporaryDirectory() as static_root:
+            storage = ManifestStaticFilesStorage(location=static_root, base_url='/static/')
+            self.assertEqual(storage.url('videos/missing.mp4'), '/static/videos/missing.mp4')
+
+    def test_static_served_without_collectstatic(self):
+        # settings_prod on Vercel: STATIC_ROOT stays empty, WhiteNoise reads static/ through the finders
+        with tempfile.TemporaryDirectory() as static_root:
+            with override_settings(STATIC_ROOT=static_root, WHITENOISE_USE_FINDERS=True):
+                response = self.client.get('/static/css/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'.hero', b''.join(response.streaming_content))
+
+
+class PageCSSTests(TestCase):
+    CSS = (
+        ":root{--accent:#8b5cf6}"
+        ".hero h1, .unused-title{font-size:3rem}"
+        "a.nav-link:hover{color:red}"
+        ".footer-links li{margin:0}"
+        "@keyframes pulse{from{opacity:0}to{opacity:1}}"
+        "@media (max-width: 768px){.hero{min-height:40vh}.modal-only{display:none}}"
+        "#booking-form .is-invalid{border-color:red}"
+    )
+
+    def test_filter_css(self):
+        html = (
+            '<html><body><nav><a class="nav-link" href="/">Home</a></nav>'
+            '<section class="hero"><h1>Studio</h1></section>'
+            '<footer><ul class="footer-links"><li>FAQ</li></ul></footer>'
+            "<form id=\"booking-form\"></form><script>field.classList.add('is-invalid')</script></body></html>"
+        )
+        blocks = split_blocks(self.CSS)
+        self.assertEqual(
+            filter_css(blocks, PageTokens.from_html(html)),
+            ":root{--accent:#8b5cf6}.hero h1{font-size:3rem}a.nav-link:hover{color:red}.footer-links li{margin:0}"
+            "@keyframes pulse{from{opacity:0}to{opacity:1}}@media (max-width: 768px){.hero{min-height:40vh}}"
+            "#booking-form .is-invalid{border-color:red}",
+        )
+        # Critical CSS only covers the navbar and the first section
+        critical = filter_css(blocks, PageTokens.from_html(above_the_fold(html)))
+        self.assertIn('.hero h1{', critical)
+        self.assertNotIn('.footer-links', critical)
+
+    def test_page_css_tag(self):
+        request = RequestFactory().get('/en/faq/')
+        request.resolver_match = mock.Mock(url_name='faq')
+        template = Template("{% load page_css %}{% page_css %}")
+        with mock.patch('booking.templatetags.page_css.get_page_css', return_value=('.hero{color:red}', 'css/pages/faq.css')):
+            html = template.render(Context({'request': request}))
+        self.assertIn('<style>.hero{color:red}</style><link rel="preload" href="/static/css/pages/faq.css" as="style"', html)
+
+        # No current bundle: the full stylesheet, render-blocking as before
+        with mock.patch('booking.templatetags.page_css.get_page_css', return_value=None):
+            html = template.render(Context({'request': request}))
+        self.assertEqual(html, '<link href="/static/css/style.css" rel="stylesheet">')
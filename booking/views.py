@@ -2,39 +2,52 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 from django.utils import timezone
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.utils.translation import gettext as _
 from django.conf import settings
-from .models import SiteSEOSettings, PageSEO
 from datetime import datetime, timedelta
 from .forms import BookingForm
 from .models import Booking, IPTracker, SpamLog, StudioSchedule, TimeSlot
+from .availability import (
+    BOOKING_WINDOW_DAYS, SLOT_CODES, STUDIO_HOURS, availability_bitmap, get_availability_range,
+    get_cached_availability, get_day_availability, get_day_schedule,
+)
+from .antispam import log_spam_attempt
+from .pagecache import cached_page
+from .landing import get_landing_page
+from .ratelimit import hit
+from .seo import apply_page_seo, get_site_seo_settings
 from .utils import send_booking_notification_email, send_booking_pending_email, send_booking_confirmation_email, send_booking_rejection_email
+import hashlib
+import json
 import uuid
 import logging
 
 # Security logger
 security_logger = logging.getLogger('django.security')
 
+# Языки, для которых у страниц есть свой шаблон <page>_<lang>.html
+TEMPLATE_LANGUAGES = ('en', 'ru', 'uk', 'de')
+
+
+def localized_template(page, lang):
+    """Шаблон страницы для языка, английский для остальных"""
+    if lang not in TEMPLATE_LANGUAGES:
+        lang = 'en'
+    return f'booking/{page}_{lang}.html'
+
+@cached_page
 def home(request):
     """Главная страница сайта с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/home_en.html',
-        'ru': 'booking/home_ru.html',
-        'uk': 'booking/home_uk.html',
-        'de': 'booking/home_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/home_en.html')
-    # PageSEO override
-    path = request.path
-    lang = lang
-    page_seo = PageSEO.objects.filter(path__in=[path, path.rstrip('/') + '/'], language=lang).first()
-    default_seo = SiteSEOSettings.objects.first()
+    template_name = localized_template('home', lang)
+    default_seo = get_site_seo_settings()
     seo = {
         'description': _('Recording studio in Berlin: recording, mixing, mastering, production. Ukrainian studio in Berlin.'),
         'keywords': 'recording studio berlin, mixing berlin, mastering berlin, ukrainian recording studio berlin',
@@ -46,18 +59,8 @@ def home(request):
         seo.setdefault('keywords', default_seo.default_keywords or seo['keywords'])
         if default_seo.gtag_enabled and default_seo.ga4_measurement_id:
             seo['ga4'] = {'id': default_seo.ga4_measurement_id}
-    if page_seo:
-        if page_seo.title:
-            # title передаётся в блок title через шаблон, мета остаются тут
-            pass
-        if page_seo.description:
-            seo['description'] = page_seo.description
-        if page_seo.keywords:
-            seo['keywords'] = page_seo.keywords
-        if page_seo.og_title:
-            seo['og_title'] = page_seo.og_title
-        if page_seo.og_description:
-            seo['og_description'] = page_seo.og_description
+    # PageSEO override (in-memory index, no query)
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/')},
@@ -66,23 +69,19 @@ def home(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/')})
 
+@cached_page
 def about(request):
     """Страница о студии с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/about_en.html',
-        'ru': 'booking/about_ru.html',
-        'uk': 'booking/about_uk.html',
-        'de': 'booking/about_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/about_en.html')
+    template_name = localized_template('about', lang)
     seo = {
         'description': _('About Danov Music Studio in Berlin: first Ukrainian-led recording studio. Equipment, experience, values.'),
         'keywords': 'about recording studio berlin, ukrainian studio berlin',
         'og_title': 'About – Danov Music Studio Berlin',
         'og_description': _('Learn about our team, equipment and mission.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/about/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/about/')},
@@ -91,23 +90,19 @@ def about(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/about/')})
 
+@cached_page
 def services(request):
     """Страница услуг с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/services_en.html',
-        'ru': 'booking/services_ru.html',
-        'uk': 'booking/services_uk.html',
-        'de': 'booking/services_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/services_en.html')
+    template_name = localized_template('services', lang)
     seo = {
         'description': _('Services: Recording, Mixing, Mastering, Production in Berlin. Transparent pricing.'),
         'keywords': 'recording berlin, mixing berlin, mastering berlin, music production berlin',
         'og_title': 'Services – Danov Music Studio Berlin',
         'og_description': _('Professional audio services in Berlin.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/services/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/services/')},
@@ -116,23 +111,19 @@ def services(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/services/')})
 
+@cached_page
 def equipment(request):
     """Страница оборудования с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/equipment_en.html',
-        'ru': 'booking/equipment_ru.html',
-        'uk': 'booking/equipment_uk.html',
-        'de': 'booking/equipment_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/equipment_en.html')
+    template_name = localized_template('equipment', lang)
     seo = {
         'description': _('Studio equipment: Neumann, Genelec, Yamaha, high-end gear in Berlin.'),
         'keywords': 'recording equipment berlin, genelec berlin, neumann berlin',
         'og_title': 'Equipment – Danov Music Studio Berlin',
         'og_description': _('High-end equipment for professional sound.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/equipment/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/equipment/')},
@@ -145,23 +136,19 @@ def gallery(request):
     """Страница галереи"""
     return render(request, 'booking/gallery.html')
 
+@cached_page
 def portfolio(request):
     """Страница портфолио с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/portfolio_en.html',
-        'ru': 'booking/portfolio_ru.html',
-        'uk': 'booking/portfolio_uk.html',
-        'de': 'booking/portfolio_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/portfolio_en.html')
+    template_name = localized_template('portfolio', lang)
     seo = {
         'description': _('Portfolio: artists and projects recorded, mixed, mastered in Berlin.'),
         'keywords': 'portfolio recording berlin, artists berlin studio',
         'og_title': 'Portfolio – Danov Music Studio Berlin',
         'og_description': _('Selected works and artists we worked with.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/portfolio/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/portfolio/')},
@@ -170,23 +157,19 @@ def portfolio(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/portfolio/')})
 
+@cached_page
 def contact(request):
-    """Страница контактов с языковыми шаблонами"""
+    """Страница контактов: один шаблон, тексты переводятся через gettext"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/contact_en.html',
-        'ru': 'booking/contact_ru.html',
-        'uk': 'booking/contact_uk.html',
-        'de': 'booking/contact_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/contact_en.html')
+    template_name = 'booking/contact.html'
     seo = {
         'description': _('Contact Danov Music Studio in Berlin: phone, email, address, working hours.'),
         'keywords': 'contact recording studio berlin',
         'og_title': 'Contact – Danov Music Studio Berlin',
         'og_description': _('Get in touch for booking and questions.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/contact/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/contact/')},
@@ -195,23 +178,19 @@ def contact(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/contact/')})
 
+@cached_page
 def artists(request):
     """Страница артистов с языковыми шаблонами"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/artists_en.html',
-        'ru': 'booking/artists_ru.html',
-        'uk': 'booking/artists_uk.html',
-        'de': 'booking/artists_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/artists_en.html')
+    template_name = localized_template('artists', lang)
     seo = {
         'description': _('Artists who worked with Danov Music Studio in Berlin.'),
         'keywords': 'artists berlin studio, clients berlin recording',
         'og_title': 'Artists – Danov Music Studio Berlin',
         'og_description': _('Artists and collaborators'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/artists/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/artists/')},
@@ -220,23 +199,19 @@ def artists(request):
     ]
     return render(request, template_name, {'seo': seo, 'hreflang_links': hreflang_links, 'hreflang_x_default': request.build_absolute_uri('/artists/')})
 
+@cached_page
 def faq(request):
-    """Общая FAQ страница с языковыми шаблонами"""
+    """Общая FAQ страница: один шаблон, тексты переводятся через gettext"""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/faq_en.html',
-        'ru': 'booking/faq_ru.html',
-        'uk': 'booking/faq_uk.html',
-        'de': 'booking/faq_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/faq_en.html')
+    template_name = 'booking/faq.html'
     seo = {
         'description': _('Frequently Asked Questions about booking, services, payments and cancellations.'),
         'keywords': 'faq recording studio berlin, booking faq, services faq',
         'og_title': 'FAQ – Danov Music Studio Berlin',
         'og_description': _('Answers about booking, services, payments and more.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/faq/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/faq/')},
@@ -252,32 +227,7 @@ def get_available_times(date_str):
     except:
         return []
     
-    # Only show times for today and future dates
-    if date < timezone.now().date():
-        return []
-    
-    # Check if date is blocked in studio schedule
-    if not StudioSchedule.is_date_available(date):
-        return []
-    
-    # Studio hours: 9:00 AM - 9:30 PM (Mon-Fri)
-    start_hour = 9
-    end_hour = 21
-    end_minute = 30
-    
-    # Generate all possible time slots
-    available_times = []
-    current_time = datetime.combine(date, datetime.min.time().replace(hour=start_hour))
-    end_time = datetime.combine(date, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-    
-    while current_time < end_time:
-        time_str = current_time.strftime('%H:%M')
-        # Check if this specific time slot is available
-        if TimeSlot.is_time_available(date, time_str):
-            available_times.append(time_str)
-        current_time += timedelta(hours=1)
-    
-    return available_times
+    return [slot['time'] for slot in get_day_availability(date) if slot['available']]
 
 
 def get_all_times_with_status(date_str):
@@ -287,78 +237,66 @@ def get_all_times_with_status(date_str):
     except:
         return []
     
-    # Only show times for today and future dates
-    if date < timezone.now().date():
-        return []
-    
-    # Check if date is blocked in studio schedule
-    date_blocked = not StudioSchedule.is_date_available(date)
-    
-    # Studio hours: 9:00 AM - 9:30 PM (Mon-Fri)
-    start_hour = 9
-    end_hour = 21
-    end_minute = 30
-    
-    # Generate all possible time slots
-    all_times = []
-    current_time = datetime.combine(date, datetime.min.time().replace(hour=start_hour))
-    end_time = datetime.combine(date, datetime.min.time().replace(hour=end_hour, minute=end_minute))
-    
-    while current_time < end_time:
-        time_str = current_time.strftime('%H:%M')
-        all_times.append(time_str)
-        current_time += timedelta(hours=1)
-    
-    # Get all time slots for this date
-    time_slots = TimeSlot.objects.filter(date=date)
-    blocked_slots = {slot.time: slot for slot in time_slots if slot.is_blocked or slot.is_booked}
-    
-    # Get confirmed bookings for this date to block multiple hours
-    confirmed_bookings = Booking.objects.filter(
-        date=date,
-        status='confirmed'
-    ).values_list('time', 'duration')
-    
-    # Block all hours for each booking duration
-    for start_time, duration in confirmed_bookings:
-        start_hour = start_time.hour
-        for hour in range(duration):
-            blocked_time = f"{start_hour + hour:02d}:00"
-            if blocked_time not in blocked_slots:
-                blocked_slots[blocked_time] = None  # Mark as booked
-    
-    # Create time slots with status
-    time_slots_with_status = []
-    for time_str in all_times:
-        if date_blocked:
-            # If date is blocked, all slots are blocked
-            status = 'blocked'
-            reason = "Date blocked"
-        else:
-            slot = blocked_slots.get(time_str)
-            if slot is None:
-                # Check if this time is blocked by a booking duration
-                if time_str in blocked_slots:
-                    status = 'booked'
-                    reason = "Booked"
-                else:
-                    status = 'available'
-                    reason = ""
-            elif slot.is_blocked:
-                status = 'blocked'
-                reason = slot.reason
-            else:
-                status = 'booked'
-                reason = f"Booked by {slot.booking.name}" if slot.booking else "Booked"
-        
-        time_slots_with_status.append({
-            'time': time_str,
-            'status': status,
-            'reason': reason,
-            'available': status == 'available'
-        })
-    
-    return time_slots_with_status
+    return get_day_availability(date)
+
+# Longest range the availability API serves in one request
+AVAILABILITY_API_MAX_DAYS = 90
+
+
+def _availability_api_range(request):
+    """Parse ?from=&to= (YYYY-MM-DD), defaulting to the booking window. None if invalid."""
+    today = timezone.now().date()
+    try:
+        start = datetime.strptime(request.GET['from'], '%Y-%m-%d').date() if request.GET.get('from') else today
+        end = datetime.strptime(request.GET['to'], '%Y-%m-%d').date() if request.GET.get('to') else start + timedelta(days=BOOKING_WINDOW_DAYS - 1)
+    except ValueError:
+        return None
+    if end < start or (end - start).days >= AVAILABILITY_API_MAX_DAYS:
+        return None
+    return start, end
+
+
+def _availability_payload(request):
+    """Response body for the requested range, built once per request. None if the range is invalid."""
+    if not hasattr(request, '_availability_payload'):
+        payload = None
+        date_range = _availability_api_range(request)
+        if date_range is not None:
+            start, end = date_range
+            availability = get_cached_availability(start, end)
+            payload = {
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'hours': STUDIO_HOURS,
+                'codes': {code: status for status, code in SLOT_CODES.items()},
+                'days': {date.isoformat(): availability_bitmap(times) for date, times in availability.items() if times},
+            }
+        request._availability_payload = payload
+    return request._availability_payload
+
+
+def _availability_etag(request):
+    """
+    Strong ETag hashed from the response body itself, so it can never describe
+    other data than it is sent with, and every worker gives the same tag
+    """
+    payload = _availability_payload(request)
+    if payload is None:
+        return None
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+@require_GET
+@cache_control(no_cache=True)
+@condition(etag_func=_availability_etag)
+def availability_api(request):
+    """Compact per-day slot bitmap for the booking calendar, with ETag / If-None-Match support"""
+    payload = _availability_payload(request)
+    if payload is None:
+        return JsonResponse({
+            'error': f'Invalid date range. Use ?from=YYYY-MM-DD&to=YYYY-MM-DD, at most {AVAILABILITY_API_MAX_DAYS} days.'
+        }, status=400)
+    return JsonResponse(payload)
 
 def get_client_ip(request):
     """Get the real client IP address"""
@@ -375,16 +313,14 @@ def check_duplicate_booking(ip_address, email, phone, date, time):
     # Check for exact duplicate in last 10 minutes
     ten_minutes_ago = timezone.now() - timedelta(minutes=10)
     
-    duplicate = Booking.objects.filter(
+    return Booking.objects.filter(
         ip_address=ip_address,
         email=email,
         phone=phone,
         date=date,
         time=time,
         created_at__gte=ten_minutes_ago
-    ).first()
-    
-    return duplicate is not None
+    ).exists()
 
 
 def booking_view(request):
@@ -399,27 +335,9 @@ def booking_view(request):
     if not selected_service:
         selected_service = request.session.get('selected_service', '')
     
-    # Cache available dates to avoid multiple database queries
-    from django.core.cache import cache
-    cache_key = 'available_dates'
-    available_dates = cache.get(cache_key)
-    
-    if available_dates is None:
-        # Generate available dates (next 7 days)
-        available_dates = []
-        for i in range(7):
-            date = timezone.now().date() + timedelta(days=i)
-            # Skip weekends
-            if date.weekday() < 5:  # Monday = 0, Friday = 4
-                times = get_all_times_with_status(date.strftime('%Y-%m-%d'))
-                # Always add the date, even if all times are blocked
-                available_dates.append({
-                    'date': date,
-                    'times': times
-                })
-        
-        # Cache for 5 minutes
-        cache.set(cache_key, available_dates, 300)
+    # Whole booking window (weekdays only), served from the per-date availability cache
+    today = timezone.now().date()
+    available_dates = get_availability_range(today, today + timedelta(days=BOOKING_WINDOW_DAYS - 1))
     
     if request.method == 'POST':
         print(f"POST request received: {request.POST}")  # Debug info
@@ -449,8 +367,11 @@ def booking_view(request):
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
         if form.is_valid():
+            # Interval index of the requested day, used for both checks below
+            day_schedule = get_day_schedule(form.cleaned_data['date'])
+            
             # Check if date is available
-            if not StudioSchedule.is_date_available(form.cleaned_data['date']):
+            if day_schedule.date_blocked:
                 if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                     return JsonResponse({
                         'success': False,
@@ -460,9 +381,8 @@ def booking_view(request):
                     messages.error(request, 'This date is not available for booking. Please select another date.')
                     return redirect('booking')
             
-            # Check if time slot is available
-            time_str = form.cleaned_data['time'].strftime('%H:%M')
-            if not TimeSlot.is_time_available(form.cleaned_data['date'], time_str):
+            # Check that no hour of the requested duration overlaps a booking or blocked slot
+            if day_schedule.conflicts(form.cleaned_data['time'], form.cleaned_data['duration']):
                 if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                     return JsonResponse({
                         'success': False,
@@ -481,10 +401,10 @@ def booking_view(request):
                 form.cleaned_data['time']
             ):
                 # Log duplicate attempt
-                SpamLog.objects.create(
-                    ip_address=client_ip,
+                log_spam_attempt(
+                    client_ip,
+                    'duplicate',
                     user_agent=user_agent,
-                    attempt_type='duplicate',
                     details=f'Duplicate booking attempt: {form.cleaned_data["email"]}'
                 )
                 
@@ -497,18 +417,43 @@ def booking_view(request):
                     messages.error(request, 'Duplicate booking detected. Please wait before submitting again.')
                     return redirect('booking')
             
+            # Per-IP / per-email / per-phone limits, counted only for valid submissions.
+            # The hit is counted before the booking is saved, so parallel requests cannot all slip through.
+            limited_by = hit(
+                'booking',
+                ip=client_ip,
+                email=form.cleaned_data['email'],
+                phone=form.cleaned_data['phone'],
+            )
+            if limited_by:
+                log_spam_attempt(
+                    client_ip,
+                    'rate_limit',
+                    user_agent=user_agent,
+                    details=f'Rate limited by {limited_by}: {form.cleaned_data["email"]}'
+                )
+                
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'Too many booking requests. Please try again later.'
+                    })
+                else:
+                    messages.error(request, 'Too many booking requests. Please try again later.')
+                    return redirect('booking')
+            
             # Save booking with IP information
             booking = form.save(commit=False)
             booking.ip_address = client_ip
             booking.user_agent = user_agent
             booking.save()
             
-            # Send email notifications
+            # Queue email notifications for the background dispatcher (send_queued_emails)
             try:
-                # Send notification to studio
-                send_booking_notification_email(booking, request)
-                # Send notification to client that request is under review
-                send_booking_pending_email(booking, request)
+                # Notification to studio
+                send_booking_notification_email(booking, request, queue=True)
+                # Notification to client that request is under review
+                send_booking_pending_email(booking, request, queue=True)
                 
                 # Clear selected service from session after successful submission
                 if 'selected_service' in request.session:
@@ -559,19 +504,6 @@ def booking_view(request):
     else:
         form = BookingForm()
     
-    # Get available times for today and next 7 days
-    available_dates = []
-    for i in range(7):
-        date = timezone.now().date() + timedelta(days=i)
-        if date.weekday() < 5:  # Monday to Friday only
-            # Get all time slots with availability status
-            all_times = get_all_times_with_status(date.strftime('%Y-%m-%d'))
-            if all_times:
-                available_dates.append({
-                    'date': date,
-                    'times': all_times
-                })
-    
     # Service information
     services_info = {
         'recording': {
@@ -629,22 +561,17 @@ def booking_view(request):
         'captcha_enabled': captcha_enabled,
     }
     
-    # Выбор шаблона по языку
+    # Один шаблон на все языки, тексты переводятся через gettext
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
-    template_map = {
-        'en': 'booking/booking_en.html',
-        'ru': 'booking/booking_ru.html',
-        'uk': 'booking/booking_uk.html',
-        'de': 'booking/booking_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/booking_en.html')
+    template_name = 'booking/booking.html'
     seo = {
         'description': _('Book recording, mixing, mastering in Berlin. Choose date and time online.'),
         'keywords': 'book recording berlin, book studio berlin, booking recording studio berlin',
         'og_title': 'Booking – Danov Music Studio Berlin',
         'og_description': _('Online booking of recording sessions in Berlin.'),
     }
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri('/en/booking/')},
         {'lang': 'ru', 'url': request.build_absolute_uri('/ru/booking/')},
@@ -663,9 +590,9 @@ def confirm_booking(request, booking_id):
         booking.status = 'confirmed'
         booking.save()
         
-        # Send confirmation email to client using new system
+        # Queue confirmation email to client
         try:
-            send_booking_confirmation_email(booking, request)
+            send_booking_confirmation_email(booking, request, queue=True)
         except Exception as e:
             print(f"Failed to send confirmation email: {e}")
     
@@ -690,9 +617,9 @@ def reject_booking(request, booking_id):
         booking.status = 'cancelled'
         booking.save()
         
-        # Send rejection email to client using new system
+        # Queue rejection email to client
         try:
-            send_booking_rejection_email(booking, request)
+            send_booking_rejection_email(booking, request, queue=True)
         except Exception as e:
             print(f"Failed to send rejection email: {e}")
     
@@ -709,26 +636,8 @@ def reject_booking(request, booking_id):
 
 
 def get_booked_times(date):
-    """Get all confirmed booking times for a specific date"""
-    confirmed_bookings = Booking.objects.filter(
-        date=date,
-        status='confirmed'
-    )
-    
-    booked_times = []
-    for booking in confirmed_bookings:
-        start_time = booking.time
-        end_time = (datetime.combine(date, start_time) + timedelta(hours=booking.duration)).time()
-        
-        # Add all hours in the booking period
-        current = datetime.combine(date, start_time)
-        end = datetime.combine(date, end_time)
-        
-        while current < end:
-            booked_times.append(current.strftime('%H:%M'))
-            current += timedelta(hours=1)
-    
-    return booked_times
+    """Get all booked hours for a specific date"""
+    return [slot['time'] for slot in get_day_schedule(date).slots() if slot['status'] == 'booked']
 
 
 def booking_status(request):
@@ -742,157 +651,21 @@ def booking_status(request):
     return render(request, 'booking/booking_status.html', context)
 
 
+@cached_page
 def landing(request, slug: str):
-    """Каркас SEO-лендингов под ключевые запросы. Мультиязычный шаблон выбирается по LANGUAGE_CODE."""
+    """Каркас SEO-лендингов под ключевые запросы. Один шаблон на все языки, тексты из gettext-каталогов."""
     lang = getattr(request, 'LANGUAGE_CODE', 'en') or 'en'
     lang = lang.split('-')[0]
     # Примеры слаги: recording-studio-berlin, mixing-berlin, mastering-berlin, ukrainian-recording-studio-berlin
-    template_map = {
-        'en': 'booking/landing_en.html',
-        'ru': 'booking/landing_ru.html',
-        'uk': 'booking/landing_uk.html',
-        'de': 'booking/landing_de.html',
-    }
-    template_name = template_map.get(lang, 'booking/landing_en.html')
-
-    # Сопоставление слогов с ключевой услугой
-    slug_to_service = {
-        'recording-studio-berlin': 'recording',
-        'mixing-berlin': 'mixing',
-        'mastering-berlin': 'mastering',
-        'music-production-berlin': 'production',
-        'vocal-tuning-berlin': 'vocal_tuning',
-        'vocal-cleanup-berlin': 'vocal_cleanup',
-        'ukrainian-recording-studio-berlin': 'recording',
-        # расширения
-        'recording-studio-in-berlin': 'recording',
-        'best-recording-studio-berlin': 'recording',
-        'recording-studio-berlin-prices': 'recording',
-        'recording-vocal-studio-berlin': 'recording',
-        'mastering-services-berlin': 'mastering',
-        'mixing-services-berlin': 'mixing',
-        'ukrainian-studio-in-berlin': 'recording',
-    }
-    service_key = slug_to_service.get(slug, 'recording')
-
-    # Данные услуг по языкам (имя, цена, описание, бенефиты)
-    services_i18n = {
-        'en': {
-            'recording': {
-                'name': 'Recording', 'price': '75€/hour', 'desc': 'Record with precision using high-end microphones and treated room.',
-                'benefits': ['Professional microphones', 'Acoustic treatment', 'Basic processing', 'Compression and EQ']
-            },
-            'mixing': {
-                'name': 'Mixing', 'price': 'from 200€', 'desc': 'Commercial-ready mix with balance, EQ, compression and effects.',
-                'benefits': ['Level balancing', 'Panning', 'EQ and compression', 'Effects and reverb']
-            },
-            'mastering': {
-                'name': 'Mastering', 'price': '50€/hour', 'desc': 'Loud, clear and ready for release on all platforms.',
-                'benefits': ['Final EQ', 'Multiband compression', 'Limiting', 'Release prep']
-            },
-            'production': {
-                'name': 'Music Production', 'price': 'from 400€', 'desc': 'From idea to finished track – custom production.',
-                'benefits': ['Arrangements', 'Chord progressions', 'Instrumentation', 'Full production']
-            },
-            'vocal_cleanup': {
-                'name': 'Vocal Cleanup', 'price': 'from 100€ to 200€', 'desc': 'Noise/breath cleanup and warping for clean takes.',
-                'benefits': ['Noise reduction', 'Vocal tuning', 'Breath control', 'Polishing']
-            },
-            'vocal_tuning': {
-                'name': 'Vocal Tuning', 'price': '100€/hour', 'desc': 'Natural-sounding pitch correction with pro tools.',
-                'benefits': ['Pitch correction', 'Natural tuning', 'Melodyne/Auto-Tune', 'Pro results']
-            },
-        },
-        'ru': {
-            'recording': {
-                'name': 'Запись', 'price': '75€/час', 'desc': 'Точная запись с премиум‑микрофонами и обработанной комнатой.',
-                'benefits': ['Профессиональные микрофоны', 'Акустическая обработка', 'Базовая обработка', 'Компрессия и EQ']
-            },
-            'mixing': {
-                'name': 'Сведение', 'price': 'от 200€', 'desc': 'Коммерческий микс: баланс, EQ, компрессия, эффекты.',
-                'benefits': ['Баланс уровней', 'Панорама', 'EQ и компрессия', 'Эффекты и реверберация']
-            },
-            'mastering': {
-                'name': 'Мастеринг', 'price': '50€/час', 'desc': 'Громко, чисто и готово к релизу на платформах.',
-                'benefits': ['Финальный EQ', 'Мультибэнд‑компрессия', 'Лимитирование', 'Подготовка к релизу']
-            },
-            'production': {
-                'name': 'Продакшн', 'price': 'от 400€', 'desc': 'От идеи до готового трека — кастомная продакшн‑работа.',
-                'benefits': ['Аранжировки', 'Аккордовые последовательности', 'Инструментовка', 'Полный продакшн']
-            },
-            'vocal_cleanup': {
-                'name': 'Vocal Cleanup', 'price': 'от 100€ до 200€', 'desc': 'Шумы/дыхание, варпинг — чистый вокал.',
-                'benefits': ['Шумоподавление', 'Тюнинг вокала', 'Контроль дыхания', 'Финальный полиш']
-            },
-            'vocal_tuning': {
-                'name': 'Тюнинг вокала', 'price': '100€/час', 'desc': 'Натуральная коррекция интонации проф. инструментами.',
-                'benefits': ['Pitch‑коррекция', 'Натуральный тюнинг', 'Melodyne/Auto‑Tune', 'Проф. результат']
-            },
-        },
-        'uk': {
-            'recording': {
-                'name': 'Запис', 'price': '75€/год', 'desc': 'Точний запис з преміум мікрофонами та обробленою кімнатою.',
-                'benefits': ['Професійні мікрофони', 'Акустична обробка', 'Базова обробка', 'Компресія та EQ']
-            },
-            'mixing': {
-                'name': 'Зведення', 'price': 'від 200€', 'desc': 'Комерційний мікс: баланс, EQ, компресія, ефекти.',
-                'benefits': ['Баланс рівнів', 'Панорама', 'EQ та компресія', 'Ефекти та реверберація']
-            },
-            'mastering': {
-                'name': 'Мастеринг', 'price': '50€/год', 'desc': 'Гучно, чисто і готово до релізу на платформах.',
-                'benefits': ['Фінальний EQ', 'Мультибенд‑компресія', 'Лімітування', 'Підготовка до релізу']
-            },
-            'production': {
-                'name': 'Музичний продакшн', 'price': 'від 400€', 'desc': 'Від ідеї до готового треку — кастомний продакшн.',
-                'benefits': ['Аранжування', 'Гармонії', 'Інструментовка', 'Повний продакшн']
-            },
-            'vocal_cleanup': {
-                'name': 'Vocal Cleanup', 'price': 'від 100€ до 200€', 'desc': 'Прибирання шумів/дихання та варпінг для чистого вокалу.',
-                'benefits': ['Шумозниження', 'Тюнінг вокалу', 'Контроль дихання', 'Фінальний поліш']
-            },
-            'vocal_tuning': {
-                'name': 'Тюнінг вокалу', 'price': '100€/год', 'desc': 'Натуральна корекція висоти звуку професійними інструментами.',
-                'benefits': ['Pitch‑корекція', 'Натуральний тюнінг', 'Melodyne/Auto‑Tune', 'Проф. результат']
-            },
-        },
-        'de': {
-            'recording': {
-                'name': 'Recording', 'price': '75€/Stunde', 'desc': 'Präzise Aufnahme mit High‑End Mikrofonen und Raumakustik.',
-                'benefits': ['Profi‑Mikrofone', 'Akustikbehandlung', 'Basis‑Bearbeitung', 'Kompression und EQ']
-            },
-            'mixing': {
-                'name': 'Mixing', 'price': 'ab 200€', 'desc': 'Release‑fertiger Mix: Balance, EQ, Kompression, Effekte.',
-                'benefits': ['Pegel‑Balance', 'Panorama', 'EQ und Kompression', 'Effekte und Hall']
-            },
-            'mastering': {
-                'name': 'Mastering', 'price': '50€/Stunde', 'desc': 'Laut, klar und bereit für den Release.',
-                'benefits': ['Finales EQ', 'Multiband‑Kompression', 'Limiting', 'Release‑Vorbereitung']
-            },
-            'production': {
-                'name': 'Music Production', 'price': 'ab 400€', 'desc': 'Von der Idee zum fertigen Track – individuelle Produktion.',
-                'benefits': ['Arrangements', 'Harmonien', 'Instrumentation', 'Full Production']
-            },
-            'vocal_cleanup': {
-                'name': 'Vocal Cleanup', 'price': 'ab 100€ bis 200€', 'desc': 'Rausch/Atmer‑Cleanup und Warping für saubere Takes.',
-                'benefits': ['Rauschminderung', 'Vocal‑Tuning', 'Atmer‑Kontrolle', 'Finaler Polish']
-            },
-            'vocal_tuning': {
-                'name': 'Vocal Tuning', 'price': '100€/Stunde', 'desc': 'Natürlich klingende Tonhöhenkorrektur mit Pro‑Tools.',
-                'benefits': ['Pitch‑Korrektur', 'Natürliches Tuning', 'Melodyne/Auto‑Tune', 'Pro‑Ergebnis']
-            },
-        },
-    }
-
-    svc = services_i18n.get(lang, services_i18n['en'])[service_key]
-
-    # Базовые SEO-данные с заострением под slug
-    pretty = slug.replace('-', ' ').title()
-    seo = {
-        'description': _('%(topic)s – professional services in Berlin. Book a session today.') % {'topic': pretty},
-        'keywords': f"{slug.replace('-', ' ')}, recording berlin, studio berlin",
-        'og_title': f"{pretty} – Danov Music Studio Berlin",
-        'og_description': _('Professional audio services in Berlin.'),
-    }
+    template_name = 'booking/landing.html'
+
+    # Контекст, базовые SEO-данные и готовый HTML страницы заранее собраны в каталоге (booking/landing.py)
+    page = get_landing_page(lang, slug)
+    if page is None:
+        # Unknown slugs are not rendered (nor stored by @cached_page)
+        raise Http404("Unknown landing page")
+    seo = dict(page.seo)
+    apply_page_seo(seo, request.path, lang)
     hreflang_links = [
         {'lang': 'en', 'url': request.build_absolute_uri(f'/en/landing/{slug}/')},
         {'lang': 'ru', 'url': request.build_absolute_uri(f'/ru/landing/{slug}/')},
@@ -903,12 +676,8 @@ def landing(request, slug: str):
         'seo': seo,
         'hreflang_links': hreflang_links,
         'hreflang_x_default': request.build_absolute_uri(f'/landing/{slug}/'),
-        'slug': slug,
-        'service_key': service_key,
-        'service_name': svc['name'],
-        'service_price': svc['price'],
-        'service_desc': svc['desc'],
-        'service_benefits': svc['benefits'],
+        'landing_content': page.content,
+        **page.context,
     })
 
 # Error handlers for better security
@@ -0,0 +1,45 @@
+"""
+Template warm-up for freshly started workers.
+
+The cached template loader compiles a template on its first use, so without
+a warm-up the first visitors of every page pay for disk reads and parsing
+in each gunicorn worker. warm_templates() compiles every template of this
+app (pages, partials, error pages and emails) into the cached loader up
+front; gunicorn.conf.py calls it from post_worker_init.
+"""
+import logging
+import os
+import time
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+
+def get_template_names():
+    """Names of all templates of the app, e.g. 'booking/email/booking_pending.html'"""
+    names = []
+    for root, dirs, files in os.walk(TEMPLATES_DIR):
+        for name in files:
+            if name.endswith(('.html', '.txt', '.xml')):
+                names.append(os.path.relpath(os.path.join(root, name), TEMPLATES_DIR).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_templates():
+    """Compile every template into the cached loader. Returns (templates compiled, seconds)."""
+    engine = engines['django']
+    start = time.perf_counter()
+    compiled = 0
+    for name in get_template_names():
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as e:
+            # A broken template must not keep the worker from starting
+            logger.error("Template warm-up failed for %s: %s", name, e)
+            continue
+        compiled += 1
+    elapsed = time.perf_counter() - start
+    logger.info("Compiled %d templates in %.1f ms", compiled, elapsed * 1000)
+    return compiled, elapsed
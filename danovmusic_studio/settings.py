@@ -41,12 +41,13 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # Before staticfiles: booking's collectstatic also builds the responsive images
+    'booking',
     'django.contrib.staticfiles',
     'django.contrib.sitemaps',
     'django_recaptcha',
     'csp',
     # 'axes',  # Temporarily disabled due to migration issues
-    'booking',
 ]
 
 MIDDLEWARE = [
@@ -135,6 +136,17 @@ AXES_VERBOSE = True
 # Rate limiting settings
 RATELIMIT_ENABLE = True
 RATELIMIT_USE_CACHE = 'default'
+# Sliding-window limits per endpoint: identifier -> (max hits, window in seconds)
+RATE_LIMITS = {
+    'booking': {'ip': (3, 3600), 'email': (3, 3600), 'phone': (3, 3600)},
+}
+
+# Full-page cache of the marketing pages (booking.pagecache); only used with a shared cache such as memcached
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Seconds between write-behind flushes of visitor IPs to IPTracker
+ANTISPAM_FLUSH_INTERVAL = 60
 
 # Cache settings for better performance
 CACHES = {
@@ -150,8 +162,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates are compiled once per process (see booking/warmup.py),
+            # the dev server still reloads them on change
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.template.context_processors.i18n',
@@ -283,6 +302,25 @@ STATICFILES_DIRS = [
 # For production
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic stores content-hashed, gzip/brotli precompressed copies that are
+# served with immutable caching (see booking/storage.py). The deployment
+# profiles always use it; development and tests keep the plain storage so no
+# collectstatic run is needed.
+MANIFEST_STATICFILES_STORAGE = 'booking.storage.ManifestStaticFilesStorage'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG else MANIFEST_STATICFILES_STORAGE,
+    },
+}
+
+# Kept out of git (too large) and copied to static/ on the server by hand:
+# collectstatic only warns when these are missing
+STATIC_UNTRACKED_FILES = ['videos/gg3.mp4']
+
+# Pre-rendered marketing pages for nginx (manage.py prerender_site)
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
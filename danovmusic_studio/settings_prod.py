@@ -27,7 +27,10 @@ STATICFILES_DIRS = [
 ]
 
 # WhiteNoise configuration for static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {**STORAGES, 'staticfiles': {'BACKEND': MANIFEST_STATICFILES_STORAGE}}
+# The @vercel/python build does not run collectstatic, so STATIC_ROOT is empty at
+# runtime: WhiteNoise serves static/ directly and the URLs keep their plain names
+WHITENOISE_USE_FINDERS = True
 
 # Security settings for production (simplified for Vercel)
 SECURE_SSL_REDIRECT = False  # Vercel handles SSL
@@ -43,7 +43,7 @@ STATICFILES_DIRS = [
 ]
 
 # Simplified static file serving.
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {**STORAGES, 'staticfiles': {'BACKEND': MANIFEST_STATICFILES_STORAGE}}
 
 # Security settings for Railway
 SECURE_SSL_REDIRECT = True
@@ -49,7 +49,7 @@ STATICFILES_DIRS = [
 ]
 
 # Simplified static file serving.
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {**STORAGES, 'staticfiles': {'BACKEND': MANIFEST_STATICFILES_STORAGE}}
 
 # Security settings for Render
 SECURE_SSL_REDIRECT = True
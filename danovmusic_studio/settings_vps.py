@@ -41,7 +41,7 @@ DATABASES = {
 
 # Static files configuration for production
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {**STORAGES, 'staticfiles': {'BACKEND': MANIFEST_STATICFILES_STORAGE}}
 
 # Media files configuration
 MEDIA_URL = '/media/'
@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.sitemaps.views import sitemap
 from booking.sitemaps import I18nStaticViewSitemap
+from booking import views as booking_views
 from django.conf.urls.i18n import i18n_patterns
 from django.conf import settings
 from django.conf.urls.static import static
@@ -27,6 +28,7 @@ urlpatterns = [
     path('', RedirectView.as_view(url='/en/', permanent=False)),
     path('i18n/', include('django.conf.urls.i18n')),
     path('robots.txt', include('booking.urls_robots')),
+    path('api/availability/', booking_views.availability_api, name='availability_api'),
 ]
 
 urlpatterns += i18n_patterns(
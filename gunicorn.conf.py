@@ -0,0 +1,18 @@
+# Gunicorn reads this file from the working directory on every start
+# (systemd, Procfile, railway_start.sh and render.yaml all run from the project root).
+# Command line options such as --workers and --bind still apply.
+
+
+def post_worker_init(worker):
+    # Django is set up at this point: compile all templates before the first request
+    from booking.warmup import warm_templates
+
+    compiled, elapsed = warm_templates()
+    worker.log.info("Worker %s: %d templates compiled in %.1f ms", worker.pid, compiled, elapsed * 1000)
+
+
+def worker_exit(server, worker):
+    # Restart, HUP or max-requests recycle: write buffered visits and SpamLog rows before the worker goes away
+    from booking.antispam import flush_at_exit
+
+    flush_at_exit()